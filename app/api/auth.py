@@ -1,4 +1,4 @@
-from fastapi import APIRouter, HTTPException, status, Depends
+from fastapi import APIRouter, HTTPException, status, Depends, BackgroundTasks
 from fastapi.responses import RedirectResponse
 from app.models.user import UserCreate, UserResponse, UserInDB
 from app.core.database import get_database
@@ -7,6 +7,9 @@ from pydantic import BaseModel, EmailStr
 from authlib.integrations.starlette_client import OAuth
 from starlette.requests import Request
 from app.core.config import settings
+from app.utils.image_variants import process_profile_image
+from app.utils.image_dedup import attach_image
+from app.utils.directory import update_directory_facets
 import random
 
 router = APIRouter()
@@ -20,7 +23,7 @@ class LoginResponse(BaseModel):
     user: UserResponse
 
 @router.post("/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
-async def register(user_data: UserCreate):
+async def register(user_data: UserCreate, background_tasks: BackgroundTasks):
     db = get_database()
     users_collection = db.users
     
@@ -38,20 +41,25 @@ async def register(user_data: UserCreate):
         "lastName": user_data.lastName,
         "email": user_data.email,
         "password": hashed_password,
-        "picturePath": user_data.picturePath or "",
+        "picturePath": await attach_image(user_data.picturePath) if user_data.picturePath else "",
         "friends": [],
         "location": user_data.location or "",
         "Year": user_data.Year or "",
         "viewedProfile": random.randint(0, 10000),
         "impressions": random.randint(0, 10000),
+        "postCount": 0,
         "provider": "local",
         "twitterUrl": "",
         "linkedInUrl": "",
     }
     
     result = await users_collection.insert_one(new_user)
+    await update_directory_facets(None, new_user)
     created_user = await users_collection.find_one({"_id": result.inserted_id})
     
+    if new_user["picturePath"]:
+        background_tasks.add_task(process_profile_image, str(result.inserted_id), new_user["picturePath"])
+    
     # Convert to response format
     created_user["_id"] = str(created_user["_id"])
     return created_user
@@ -148,11 +156,13 @@ async def discord_callback(request: Request):
                 "Year": "",
                 "viewedProfile": 0,
                 "impressions": 0,
+                "postCount": 0,
                 "twitterUrl": "",
                 "linkedInUrl": "",
                 "password": ""  # No password for OAuth users
             }
             result = await users_collection.insert_one(new_user)
+            await update_directory_facets(None, new_user)
             user = await users_collection.find_one({"_id": result.inserted_id})
         
         # Generate JWT
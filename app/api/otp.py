@@ -1,8 +1,11 @@
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, HTTPException, status, BackgroundTasks
 from pydantic import BaseModel, EmailStr
 from app.core.database import get_database
 from app.core.security import hash_password
 from app.utils.email_service import generate_otp, send_otp_email
+from app.utils.image_variants import process_profile_image
+from app.utils.image_dedup import attach_image
+from app.utils.directory import update_directory_facets
 from bson import ObjectId
 import random
 
@@ -76,7 +79,7 @@ async def send_otp(request: SendOTPRequest):
         raise HTTPException(status_code=500, detail=f"Failed to send OTP: {str(e)}")
 
 @router.post("/verify")
-async def verify_otp(request: VerifyOTPRequest):
+async def verify_otp(request: VerifyOTPRequest, background_tasks: BackgroundTasks):
     try:
         db = get_database()
         users_collection = db.users
@@ -109,20 +112,25 @@ async def verify_otp(request: VerifyOTPRequest):
             "lastName": user_data["lastName"],
             "email": user_data["email"],
             "password": user_data["password"],
-            "picturePath": user_data["picturePath"],
+            "picturePath": await attach_image(user_data["picturePath"]) if user_data["picturePath"] else "",
             "location": user_data["location"],
             "Year": user_data["Year"],
             "friends": [],
             "viewedProfile": random.randint(0, 10000),
             "impressions": random.randint(0, 10000),
+            "postCount": 0,
             "provider": "local",
             "twitterUrl": "",
             "linkedInUrl": ""
         }
         
         result = await users_collection.insert_one(new_user)
+        await update_directory_facets(None, new_user)
         await otp_collection.delete_one({"email": request.email.lower()})
         
+        if new_user["picturePath"]:
+            background_tasks.add_task(process_profile_image, str(result.inserted_id), new_user["picturePath"])
+        
         # Get created user
         created_user = await users_collection.find_one({"_id": result.inserted_id})
         created_user.pop("password", None)
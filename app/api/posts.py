@@ -1,20 +1,65 @@
-from fastapi import APIRouter, HTTPException, Depends, status
-from typing import List
-from app.core.database import get_database
+from fastapi import APIRouter, HTTPException, Depends, status, BackgroundTasks, Query, Request
+from typing import List, Literal, Optional, Tuple
+from datetime import datetime, timezone
+from app.core.config import settings
+from app.core.database import get_database, get_read_database
 from app.core.security import verify_token
 from app.models.post import PostCreate, PostResponse
-from app.core.redis_client import publish_notification_event, NotificationChannels
+from app.core.redis_client import NotificationChannels
+from app.core.outbox import outbox_event, outbox_transaction, enqueue_events
+from app.utils.image_variants import process_post_image, apply_image_size
+from app.utils.image_dedup import attach_image
+from app.utils.friend_cache import get_friend_ids
+from app.utils.seen_posts import filter_seen, mark_seen
+from app.utils.like_aggregation import record_like, cancel_like
+from app.utils.trending import POST_WEIGHT, record_engagement, record_like_engagement, get_trending_post_ids
+from app.utils.tags import TRENDING_WINDOWS, extract_hashtags, extract_mentions, index_post_tags, get_recent_tag_posts, get_trending_tags
+from app.core.serialization import ModelSerializer, dumps
+from unilink_shared.singleflight import singleflight
+from app.core.streaming import wants_ndjson, ndjson_response
+from app.core.page_cache import negotiate_encoding, get_cached_page, cache_page, encoded_response
+from app.core.etag import VersionKeys, bump_versions, get_etag, not_modified, cache_headers
 from bson import ObjectId
+from pymongo import DESCENDING, ReadPreference
 from pydantic import BaseModel
 
 router = APIRouter()
 
+# Feed lists skip per-item pydantic validation
+post_serializer = ModelSerializer(PostResponse, extra_fields=("pictureVariants", "userPictureVariants"))
+
+# Posts checked against the seen filter per round trip while paging the unseen feed
+UNSEEN_BATCH_SIZE = 100
+
 class LikeRequest(BaseModel):
     userId: str
 
+def _encode_cursor(post: dict) -> str:
+    created_at = post.get("createdAt")
+    return f"{created_at.isoformat() if created_at else ''}|{post['_id']}"
+
+def _cursor_filter(cursor: str) -> dict:
+    """Posts strictly after the cursor in (createdAt desc, _id desc) order"""
+    created_at, _, post_id = cursor.partition("|")
+    try:
+        post_id = ObjectId(post_id)
+        created_at = datetime.fromisoformat(created_at) if created_at else None
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    
+    if created_at is None:
+        # Posts from before createdAt existed sort after all dated ones
+        return {"createdAt": None, "_id": {"$lt": post_id}}
+    return {"$or": [
+        {"createdAt": {"$lt": created_at}},
+        {"createdAt": created_at, "_id": {"$lt": post_id}},
+        {"createdAt": None},
+    ]}
+
 @router.post("", response_model=List[PostResponse], status_code=status.HTTP_201_CREATED)
 async def create_post(
     post_data: PostCreate,
+    background_tasks: BackgroundTasks,
     current_user: dict = Depends(verify_token)
 ):
     db = get_database()
@@ -29,67 +74,292 @@ async def create_post(
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     
+    # Point at the canonical copy of the uploaded picture
+    picture_path = post_data.picturePath or ""
+    if picture_path:
+        picture_path = await attach_image(picture_path)
+    
     # Create post
+    post_id = ObjectId()
     new_post = {
+        "_id": post_id,
         "userId": post_data.userId,
         "firstName": user["firstName"],
         "lastName": user["lastName"],
         "location": user.get("location", ""),
         "description": post_data.description or "",
         "userPicturePath": user.get("picturePath", ""),
-        "picturePath": post_data.picturePath or "",
+        "userPictureVariants": user.get("pictureVariants", {}),
+        "picturePath": picture_path,
         "likes": {},
-        "comments": []
+        "comments": [],
+        "hashtags": extract_hashtags(post_data.description),
+        "mentions": extract_mentions(post_data.description),
+        "createdAt": datetime.utcnow(),
+        "updatedAt": datetime.utcnow()
     }
     
-    result = await posts_collection.insert_one(new_post)
-    created_post = await posts_collection.find_one({"_id": result.inserted_id})
-    
-    # Notify friends
-    if user.get("friends"):
-        for friend_id in user["friends"]:
-            await publish_notification_event(
-                NotificationChannels.FRIEND_POST,
-                {
-                    "userId": friend_id,
-                    "actorId": post_data.userId,
-                    "actorName": f"{user['firstName']} {user['lastName']}",
-                    "actorPicture": user.get("picturePath", ""),
-                    "relatedId": str(created_post["_id"]),
-                    "metadata": {
-                        "postDescription": post_data.description[:100] if post_data.description else ""
-                    }
+    # Notify friends, recorded with the post so a crash cannot drop the events
+    events = [
+        outbox_event(
+            NotificationChannels.FRIEND_POST,
+            {
+                "userId": friend_id,
+                "actorId": post_data.userId,
+                "actorName": f"{user['firstName']} {user['lastName']}",
+                "actorPicture": user.get("picturePath", ""),
+                "relatedId": str(post_id),
+                "metadata": {
+                    "postDescription": post_data.description[:100] if post_data.description else ""
                 }
-            )
+            },
+            event_id=f"friend-post:{post_id}:{friend_id}"
+        )
+        for friend_id in user.get("friends", [])
+    ]
+    
+    async with outbox_transaction() as session:
+        await posts_collection.insert_one(new_post, session=session)
+        # Profiles show the total without counting posts on every view
+        # (accounts that predate the counter get it backfilled by get_user)
+        await users_collection.update_one(
+            {"_id": user["_id"], "postCount": {"$exists": True}},
+            {"$inc": {"postCount": 1}},
+            session=session
+        )
+        await enqueue_events(events, session=session)
+    # Friends lists embed the author's postCount
+    await bump_versions(
+        VersionKeys.POSTS, VersionKeys.user(post_data.userId),
+        *[VersionKeys.friends(f) for f in user.get("friends", [])]
+    )
+    created_at_ms = int(new_post["createdAt"].replace(tzinfo=timezone.utc).timestamp() * 1000)
+    await index_post_tags(str(post_id), new_post["hashtags"], created_at_ms)
+    await record_engagement(str(post_id), POST_WEIGHT)
+    
+    # Generate thumbnails and responsive sizes after the response is sent
+    if new_post["picturePath"]:
+        background_tasks.add_task(process_post_image, str(post_id), new_post["picturePath"])
     
     # Return all posts
-    posts = await posts_collection.find().to_list(length=1000)
-    for post in posts:
-        post["_id"] = str(post["_id"])
+    posts = await posts_collection.find({}, post_serializer.projection).to_list(length=1000)
+    return post_serializer.response(posts, status_code=status.HTTP_201_CREATED)
+
+async def _unseen_page(cursor, viewer_id: str, limit: int) -> Tuple[List[dict], Optional[str]]:
+    """First posts from the cursor not yet served to the viewer, marked as served.
+
+    Reads at most UNSEEN_FEED_MAX_SCAN posts, so a viewer who has seen nearly
+    everything does not walk the whole collection. Also returns where the next
+    page should resume, None once the cursor ran out.
+    """
+    max_scan = settings.UNSEEN_FEED_MAX_SCAN
+    posts = []
+    batch = []
+    scanned = 0
+    last = None
+    async for post in cursor.limit(max_scan).batch_size(UNSEEN_BATCH_SIZE):
+        batch.append(post)
+        scanned += 1
+        if len(batch) < UNSEEN_BATCH_SIZE:
+            continue
+        # Bloom filter lookups, a false positive only hides a post early
+        seen = await filter_seen(viewer_id, [str(p["_id"]) for p in batch])
+        posts += [p for p in batch if str(p["_id"]) not in seen]
+        last = batch[-1]
+        batch = []
+        if len(posts) >= limit:
+            break
+    if batch and len(posts) < limit:
+        seen = await filter_seen(viewer_id, [str(p["_id"]) for p in batch])
+        posts += [p for p in batch if str(p["_id"]) not in seen]
+        last = batch[-1]
     
-    return posts
+    next_cursor = None
+    if len(posts) > limit:
+        # Unserved posts of the last batch come first on the next page
+        next_cursor = _encode_cursor(posts[limit - 1])
+    elif scanned == max_scan or len(posts) == limit:
+        next_cursor = _encode_cursor(last)
+    posts = posts[:limit]
+    await mark_seen(viewer_id, [str(post["_id"]) for post in posts])
+    return posts, next_cursor
 
 @router.get("", response_model=List[PostResponse])
-async def get_feed_posts(current_user: dict = Depends(verify_token)):
-    db = get_database()
+async def get_feed_posts(
+    request: Request,
+    imageSize: Optional[int] = Query(None, ge=1, description="Rendered image width in pixels"),
+    scope: Literal["all", "friends"] = Query("all", description="Every post, or only the viewer's and their friends'"),
+    unseen: bool = Query(False, description="Skip posts already served to the viewer"),
+    limit: int = Query(20, ge=1, le=100, description="Page size of the unseen feed"),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor of the previous unseen page"),
+    current_user: dict = Depends(verify_token)
+):
+    db = get_read_database("feed")
     posts_collection = db.posts
     
-    posts = await posts_collection.find().to_list(length=1000)
-    for post in posts:
-        post["_id"] = str(post["_id"])
+    # The friends feed also changes whenever the viewer's friend list does
+    version_keys = [VersionKeys.POSTS]
+    if scope == "friends":
+        version_keys.append(VersionKeys.friends(current_user["id"]))
+    
+    # NDJSON clients get posts written out as they are read
+    stream = wants_ndjson(request) and not unseen
+    
+    # Answer repeat views from the version counter alone. A lagging secondary
+    # could pair stale posts with a fresh version, so only primary reads get ETags.
+    # The unseen feed changes with every page served and streams are not cached
+    etag = None
+    if db.read_preference == ReadPreference.PRIMARY and not unseen and not stream:
+        etag = await get_etag(request, *version_keys)
+    cached = not_modified(request, etag)
+    if cached:
+        return cached
+    
+    # Repeat page fetches skip Mongo and serialization, served pre-compressed
+    encoding = negotiate_encoding(request.headers.get("accept-encoding", ""))
+    if etag:
+        page = await get_cached_page("feed", etag, encoding)
+        if page is not None:
+            return encoded_response(page, encoding, cache_headers(etag))
+    
+    query = {}
+    if scope == "friends":
+        # $in plus sort merges the per-author ranges of the userId_createdAt index
+        author_ids = [current_user["id"], *await get_friend_ids(current_user["id"])]
+        query["userId"] = {"$in": author_ids}
     
-    return posts
+    if unseen:
+        if cursor:
+            query.update(_cursor_filter(cursor))
+        # Newest first, read on until a page of unseen posts is found or the scan cap is hit
+        posts, next_cursor = await _unseen_page(
+            posts_collection.find(query, post_serializer.projection).sort([("createdAt", DESCENDING), ("_id", DESCENDING)]),
+            current_user["id"], limit
+        )
+        body = dumps(post_serializer.dump_many([apply_image_size(post, imageSize) for post in posts]))
+        return encoded_response(body, None, {"X-Next-Cursor": next_cursor} if next_cursor else None)
+    
+    posts_cursor = posts_collection.find(query, post_serializer.projection)
+    if scope == "friends":
+        posts_cursor = posts_cursor.sort("createdAt", DESCENDING)
+    posts_cursor = posts_cursor.limit(1000)
+    if stream:
+        return ndjson_response(posts_cursor, lambda post: post_serializer.dump(apply_image_size(post, imageSize)))
+    # Concurrent feed loads (e.g. right after a new post invalidated the cached page) share one query.
+    # The version is part of the key, a request that saw a newer version must not join an older
+    # query and cache its result under the new ETag
+    flight = current_user["id"] if scope == "friends" else "all"
+    posts = await singleflight.do("feed", f"{flight}:{etag}", lambda: posts_cursor.to_list(length=1000))
+    posts = [apply_image_size(post, imageSize) for post in posts]
+    
+    body = dumps(post_serializer.dump_many(posts))
+    if not etag:
+        return encoded_response(body, None)
+    pages = await cache_page("feed", etag, body)
+    return encoded_response(pages[encoding] if encoding else body, encoding, cache_headers(etag))
 
+@router.get("/trending", response_model=List[PostResponse])
+async def get_trending_posts(
+    imageSize: Optional[int] = Query(None, ge=1, description="Rendered image width in pixels"),
+    limit: int = Query(20, ge=1, le=100),
+    current_user: dict = Depends(verify_token)
+):
+    db = get_read_database("feed")
+    posts_collection = db.posts
+    
+    # Ranked entirely in Redis, Mongo only loads the winners
+    trending_ids = await get_trending_post_ids(limit)
+    found = await posts_collection.find(
+        {"_id": {"$in": [ObjectId(post_id) for post_id in trending_ids]}}, post_serializer.projection
+    ).to_list(length=limit)
+    by_id = {str(post["_id"]): post for post in found}
+    posts = [by_id[post_id] for post_id in trending_ids if post_id in by_id]
+    posts = [apply_image_size(post, imageSize) for post in posts]
+    
+    return post_serializer.response(posts)
+
+class TrendingTag(BaseModel):
+    tag: str
+    count: int
+
+@router.get("/tags/trending", response_model=List[TrendingTag])
+async def get_trending(
+    window: Literal[tuple(TRENDING_WINDOWS)] = Query("24h"),
+    limit: int = Query(10, ge=1, le=50),
+    current_user: dict = Depends(verify_token)
+):
+    return [{"tag": tag, "count": count} for tag, count in await get_trending_tags(window, limit)]
+
+@router.get("/tags/{tag}", response_model=List[PostResponse])
+async def get_tag_posts(
+    tag: str,
+    imageSize: Optional[int] = Query(None, ge=1, description="Rendered image width in pixels"),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor of the previous page"),
+    current_user: dict = Depends(verify_token)
+):
+    db = get_read_database("tags")
+    posts_collection = db.posts
+    tag = tag.lstrip("#").lower()
+    
+    # A full first page comes from the tag's recency set, everything else from the hashtags index
+    posts = []
+    recent_ids = [] if cursor else await get_recent_tag_posts(tag, limit)
+    if len(recent_ids) == limit:
+        found = await posts_collection.find(
+            {"_id": {"$in": [ObjectId(post_id) for post_id in recent_ids]}}, post_serializer.projection
+        ).to_list(length=limit)
+        by_id = {str(post["_id"]): post for post in found}
+        posts = [by_id[post_id] for post_id in recent_ids if post_id in by_id]
+    else:
+        query = {"hashtags": tag}
+        if cursor:
+            query.update(_cursor_filter(cursor))
+        posts = await posts_collection.find(query, post_serializer.projection) \
+            .sort([("createdAt", DESCENDING), ("_id", DESCENDING)]) \
+            .limit(limit) \
+            .to_list(length=limit)
+    posts = [apply_image_size(post, imageSize) for post in posts]
+    
+    headers = {}
+    if len(posts) == limit:
+        headers["X-Next-Cursor"] = _encode_cursor(posts[-1])
+    return post_serializer.response(posts, headers=headers)
+
+# Registered after the /tags routes, "/tags/posts" must reach the tag timeline
 @router.get("/{userId}/posts", response_model=List[PostResponse])
-async def get_user_posts(userId: str, current_user: dict = Depends(verify_token)):
-    db = get_database()
+async def get_user_posts(
+    request: Request,
+    userId: str,
+    imageSize: Optional[int] = Query(None, ge=1, description="Rendered image width in pixels"),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor of the previous page"),
+    current_user: dict = Depends(verify_token)
+):
+    db = get_read_database("user_posts")
     posts_collection = db.posts
     
-    posts = await posts_collection.find({"userId": userId}).to_list(length=1000)
-    for post in posts:
-        post["_id"] = str(post["_id"])
+    # Keyset pagination walks the userId_createdAt_id index, no skip
+    query = {"userId": userId}
+    if cursor:
+        query.update(_cursor_filter(cursor))
+    
+    posts_cursor = posts_collection.find(query, post_serializer.projection) \
+        .sort([("createdAt", DESCENDING), ("_id", DESCENDING)])
+    
+    # NDJSON streams every post from the cursor on, without paging
+    if wants_ndjson(request):
+        return ndjson_response(posts_cursor, lambda post: post_serializer.dump(apply_image_size(post, imageSize)))
     
-    return posts
+    posts = await singleflight.do(
+        "user_posts", f"{userId}:{limit}:{cursor}", lambda: posts_cursor.limit(limit).to_list(length=limit)
+    )
+    posts = [apply_image_size(post, imageSize) for post in posts]
+    
+    headers = {}
+    if len(posts) == limit:
+        headers["X-Next-Cursor"] = _encode_cursor(posts[-1])
+    return post_serializer.response(posts, headers=headers)
 
 @router.patch("/{id}/like", response_model=PostResponse)
 async def like_post(
@@ -110,10 +380,13 @@ async def like_post(
     
     likes = post.get("likes", {})
     user_id = like_data.userId
+    events = []
     
     if user_id in likes:
-        # Unlike
+        # Unlike, taking back the notification if it has not gone out yet
         del likes[user_id]
+        if post["userId"] != user_id:
+            await cancel_like(id, post["userId"], user_id)
     else:
         # Like
         likes[user_id] = True
@@ -122,23 +395,30 @@ async def like_post(
         if post["userId"] != user_id:
             liker = await users_collection.find_one({"_id": ObjectId(user_id)})
             if liker:
-                await publish_notification_event(
-                    NotificationChannels.LIKE,
-                    {
-                        "userId": post["userId"],
-                        "actorId": user_id,
-                        "actorName": f"{liker['firstName']} {liker['lastName']}",
-                        "actorPicture": liker.get("picturePath", ""),
-                        "relatedId": id
-                    }
-                )
+                like_event = {
+                    "userId": post["userId"],
+                    "actorId": user_id,
+                    "actorName": f"{liker['firstName']} {liker['lastName']}",
+                    "actorPicture": liker.get("picturePath", ""),
+                    "relatedId": id
+                }
+                # Likes are batched into one event per post every few seconds,
+                # if Redis is unavailable this one is sent on its own
+                actor = {key: like_event[key] for key in ("actorId", "actorName", "actorPicture")}
+                if not await record_like(id, post["userId"], actor):
+                    events.append(outbox_event(NotificationChannels.LIKE, like_event))
     
     # Update post
-    updated_post = await posts_collection.find_one_and_update(
-        {"_id": ObjectId(id)},
-        {"$set": {"likes": likes}},
-        return_document=True
-    )
+    async with outbox_transaction() as session:
+        updated_post = await posts_collection.find_one_and_update(
+            {"_id": ObjectId(id)},
+            {"$set": {"likes": likes}},
+            return_document=True,
+            session=session
+        )
+        await enqueue_events(events, session=session)
+    await bump_versions(VersionKeys.POSTS)
+    await record_like_engagement(id, user_id, user_id in likes)
     
     updated_post["_id"] = str(updated_post["_id"])
     return updated_post
\ No newline at end of file
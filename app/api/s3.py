@@ -1,7 +1,8 @@
 from fastapi import APIRouter, HTTPException, Depends
 from pydantic import BaseModel
 from app.core.security import verify_token
-from app.utils.s3_utils import generate_presigned_url
+from app.utils.s3_utils import generate_presigned_url, get_public_url
+from app.utils.image_dedup import finalize_upload, is_pending_upload
 from typing import Optional
 
 router = APIRouter()
@@ -14,6 +15,13 @@ class UploadUrlResponse(BaseModel):
     key: str
     accessUrl: str
 
+class FinalizeUploadRequest(BaseModel):
+    key: str
+
+class FinalizeUploadResponse(BaseModel):
+    key: str
+    accessUrl: str
+
 @router.post("/upload-url/profile", response_model=UploadUrlResponse)
 async def get_profile_upload_url(request: UploadUrlRequest):
     """Get presigned URL for profile picture upload (NO AUTH for registration)"""
@@ -51,4 +59,17 @@ async def get_post_upload_url(
         return result
     except Exception as e:
         print(f"Error generating post upload URL: {e}")
-        raise HTTPException(status_code=500, detail="Failed to generate upload URL")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail="Failed to generate upload URL")
+
+@router.post("/finalize", response_model=FinalizeUploadResponse)
+async def finalize_uploaded_file(request: FinalizeUploadRequest):
+    """Deduplicate an uploaded file by content (NO AUTH, key must have been issued)"""
+    if not await is_pending_upload(request.key):
+        raise HTTPException(status_code=404, detail="Upload not found")
+    
+    try:
+        key = await finalize_upload(request.key)
+        return {"key": key, "accessUrl": get_public_url(key)}
+    except Exception as e:
+        print(f"Error finalizing upload: {e}")
+        raise HTTPException(status_code=500, detail="Failed to finalize upload")
@@ -1,14 +1,35 @@
-from fastapi import APIRouter, HTTPException, Depends
-from typing import List
-from app.core.database import get_database
+from fastapi import APIRouter, HTTPException, Depends, Query, Request, Response, BackgroundTasks
+from typing import Dict, List, Optional
+from app.core.database import get_database, get_read_database
 from app.core.security import verify_token
 from app.models.user import UserResponse
 from app.core.redis_client import publish_notification_event, NotificationChannels
-from pydantic import BaseModel
+from app.core.outbox import outbox_event, outbox_transaction, enqueue_events
+from app.utils.image_variants import apply_image_size
+from app.utils.friend_cache import update_friend_sets, count_mutual_friends, get_mutual_friend_ids
+from app.utils.recommendations import get_recommendations, update_recommendations
+from app.utils.directory import get_directory_facets
+from app.utils.user_cards import get_user_cards
+from app.utils.data_export import create_export_job, get_export_job, run_export, get_export_download_url
+from app.core.serialization import ModelSerializer, BSONJSONResponse
+from app.core.cache import Cache
+from app.core.config import settings
+from app.core.etag import VersionKeys, bump_versions, get_etag, not_modified, cache_headers
+from pydantic import BaseModel, Field
 from bson import ObjectId
 
 router = APIRouter()
 
+# User lists skip per-item pydantic validation, the projection keeps passwords in Mongo
+user_serializer = ModelSerializer(UserResponse, extra_fields=("pictureVariants",))
+
+# Profiles are keyed by their ETag, so an edit is never served from the cache
+profile_cache = Cache(
+    "user_profile",
+    ttl=settings.PROFILE_CACHE_TTL_SECONDS,
+    stale_ttl=settings.PROFILE_CACHE_STALE_SECONDS,
+)
+
 class SocialUrlsUpdate(BaseModel):
     twitterUrl: str = ""
     linkedInUrl: str = ""
@@ -16,44 +37,157 @@ class SocialUrlsUpdate(BaseModel):
 class SearchRequest(BaseModel):
     query: str
 
+class MutualCountsRequest(BaseModel):
+    userIds: List[str] = Field(max_length=500)
+
+class MutualCountsResponse(BaseModel):
+    counts: Dict[str, int]
+
+class BatchUsersRequest(BaseModel):
+    userIds: List[str] = Field(max_length=500)
+
+class UserCard(BaseModel):
+    id: str = Field(alias="_id")
+    firstName: str
+    lastName: str
+    picturePath: Optional[str] = ""
+    Year: Optional[str] = ""
+
+class ExportJobResponse(BaseModel):
+    jobId: str
+    status: str
+    downloadUrl: Optional[str] = None
+
+class DirectoryResponse(BaseModel):
+    users: List[UserResponse]
+    facets: Dict[str, Dict[str, int]]
+    total: int
+    nextCursor: Optional[str] = None
+
+@router.post("/batch", response_model=List[UserCard])
+async def get_users_batch(
+    request: BatchUsersRequest,
+    current_user: dict = Depends(verify_token)
+):
+    # Read-only on purpose: unlike GET /users/{id} this records no profile views
+    return BSONJSONResponse(await get_user_cards(request.userIds))
+
+@router.get("/directory", response_model=DirectoryResponse)
+async def get_directory(
+    Year: Optional[str] = Query(None),
+    location: Optional[str] = Query(None),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="nextCursor of the previous page"),
+    imageSize: Optional[int] = Query(None, ge=1, description="Rendered image width in pixels"),
+    current_user: dict = Depends(verify_token)
+):
+    db = get_read_database("directory")
+    users_collection = db.users
+    
+    # Every filter combination has a (filter..., _id) index, pages continue after the last _id
+    query = {}
+    if Year:
+        query["Year"] = Year
+    if location:
+        query["location"] = location
+    if cursor:
+        if not ObjectId.is_valid(cursor):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        query["_id"] = {"$lt": ObjectId(cursor)}
+    
+    users = await users_collection.find(query, user_serializer.projection) \
+        .sort("_id", -1) \
+        .limit(limit) \
+        .to_list(length=limit)
+    users = [apply_image_size(user, imageSize) for user in users]
+    
+    # Counts are kept up to date on every profile change, no $group per request
+    facets, total = await get_directory_facets(Year or None, location or None)
+    
+    return BSONJSONResponse({
+        "users": user_serializer.dump_many(users),
+        "facets": facets,
+        "total": total,
+        "nextCursor": str(users[-1]["_id"]) if len(users) == limit else None,
+    })
+
 @router.get("/{id}", response_model=UserResponse)
-async def get_user(id: str, current_user: dict = Depends(verify_token)):
+async def get_user(
+    id: str,
+    request: Request,
+    response: Response,
+    imageSize: Optional[int] = Query(None, ge=1, description="Rendered image width in pixels"),
+    current_user: dict = Depends(verify_token)
+):
     db = get_database()
     users_collection = db.users
     
     if not ObjectId.is_valid(id):
         raise HTTPException(status_code=400, detail="Invalid user ID")
     
-    user = await users_collection.find_one({"_id": ObjectId(id)})
+    # Skip loading the profile when the client already has this version
+    etag = await get_etag(request, VersionKeys.user(id))
+    cached = not_modified(request, etag)
+    if cached:
+        # A revalidation of a profile the viewer already holds is not a new view
+        return cached
+    
+    async def load_profile():
+        user = await users_collection.find_one({"_id": ObjectId(id)}, {"password": 0})
+        if user and "postCount" not in user:
+            # Accounts from before postCount was maintained get it counted once
+            user["postCount"] = await db.posts.count_documents({"userId": id})
+            await users_collection.update_one(
+                {"_id": user["_id"], "postCount": {"$exists": False}},
+                {"$set": {"postCount": user["postCount"]}}
+            )
+        return user
+
+    # Popular profiles are requested by many viewers at once, load them once
+    # The tail of the ETag hashes the query string, the profile only depends on the versions
+    version = etag.rsplit("-", 1)[0] if etag else None
+    user = await profile_cache.get_or_compute(id, load_profile, version=version)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     
-    # Track profile view
+    # Track profile view (repeat views still count), the viewer's card comes from Redis
     viewer_id = current_user.get("id")
     if viewer_id and viewer_id != id:
-        viewer = await users_collection.find_one({"_id": ObjectId(viewer_id)})
-        if viewer:
+        viewers = await get_user_cards([viewer_id])
+        if viewers:
+            viewer = viewers[0]
             await publish_notification_event(
                 NotificationChannels.PROFILE_VIEW,
                 {
                     "userId": id,
                     "actorId": viewer_id,
                     "actorName": f"{viewer['firstName']} {viewer['lastName']}",
-                    "actorPicture": viewer.get("picturePath", "")
+                    "actorPicture": viewer["picturePath"]
                 }
             )
     
-    user["_id"] = str(user["_id"])
-    return user
+    response.headers.update(cache_headers(etag))
+    # The profile may be shared with concurrent requests, shape a copy
+    return apply_image_size({**user, "_id": str(user["_id"])}, imageSize)
 
 @router.get("/{id}/friends", response_model=List[UserResponse])
-async def get_user_friends(id: str, current_user: dict = Depends(verify_token)):
+async def get_user_friends(
+    id: str,
+    request: Request,
+    imageSize: Optional[int] = Query(None, ge=1, description="Rendered image width in pixels"),
+    current_user: dict = Depends(verify_token)
+):
     db = get_database()
     users_collection = db.users
     
     if not ObjectId.is_valid(id):
         raise HTTPException(status_code=400, detail="Invalid user ID")
     
+    etag = await get_etag(request, VersionKeys.friends(id))
+    cached = not_modified(request, etag)
+    if cached:
+        return cached
+    
     user = await users_collection.find_one({"_id": ObjectId(id)})
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
@@ -62,17 +196,98 @@ async def get_user_friends(id: str, current_user: dict = Depends(verify_token)):
     friends = []
     for friend_id in user.get("friends", []):
         if ObjectId.is_valid(friend_id):
-            friend = await users_collection.find_one({"_id": ObjectId(friend_id)})
+            friend = await users_collection.find_one({"_id": ObjectId(friend_id)}, user_serializer.projection)
             if friend:
-                friend["_id"] = str(friend["_id"])
-                friends.append(friend)
+                friends.append(apply_image_size(friend, imageSize))
+    
+    return user_serializer.response(friends, headers=cache_headers(etag))
+
+@router.get("/{id}/mutual/{otherId}", response_model=List[UserResponse])
+async def get_mutual_friends(
+    id: str,
+    otherId: str,
+    imageSize: Optional[int] = Query(None, ge=1, description="Rendered image width in pixels"),
+    current_user: dict = Depends(verify_token)
+):
+    db = get_database()
+    users_collection = db.users
+    
+    if not ObjectId.is_valid(id) or not ObjectId.is_valid(otherId):
+        raise HTTPException(status_code=400, detail="Invalid user ID")
+    
+    # Intersected in Redis, only the shared friends are loaded from Mongo
+    mutual_ids = [ObjectId(f) for f in await get_mutual_friend_ids(id, otherId) if ObjectId.is_valid(f)]
+    friends = await users_collection.find({"_id": {"$in": mutual_ids}}, user_serializer.projection).to_list(length=None)
+    friends = [apply_image_size(friend, imageSize) for friend in friends]
     
-    return friends
+    return user_serializer.response(friends)
+
+@router.post("/{id}/mutual/counts", response_model=MutualCountsResponse)
+async def get_mutual_friend_counts(
+    id: str,
+    request: MutualCountsRequest,
+    current_user: dict = Depends(verify_token)
+):
+    if not ObjectId.is_valid(id):
+        raise HTTPException(status_code=400, detail="Invalid user ID")
+    
+    candidate_ids = list(dict.fromkeys(request.userIds))
+    return {"counts": await count_mutual_friends(id, candidate_ids)}
+
+@router.get("/{id}/recommendations", response_model=List[UserResponse])
+async def get_friend_recommendations(
+    id: str,
+    limit: int = Query(20, ge=1, le=100),
+    imageSize: Optional[int] = Query(None, ge=1, description="Rendered image width in pixels"),
+    current_user: dict = Depends(verify_token)
+):
+    db = get_database()
+    users_collection = db.users
+    
+    if not ObjectId.is_valid(id):
+        raise HTTPException(status_code=400, detail="Invalid user ID")
+    
+    # Scores are maintained as friendships change, reading them is one ZREVRANGE
+    recommended_ids = [ObjectId(r) for r in await get_recommendations(id, limit) if ObjectId.is_valid(r)]
+    users = await users_collection.find({"_id": {"$in": recommended_ids}}, user_serializer.projection).to_list(length=None)
+    by_id = {user["_id"]: apply_image_size(user, imageSize) for user in users}
+    
+    return user_serializer.response([by_id[r] for r in recommended_ids if r in by_id])
+
+@router.post("/{id}/export", response_model=ExportJobResponse, status_code=202)
+async def start_data_export(
+    id: str,
+    background_tasks: BackgroundTasks,
+    current_user: dict = Depends(verify_token)
+):
+    if not ObjectId.is_valid(id):
+        raise HTTPException(status_code=400, detail="Invalid user ID")
+    if current_user.get("id") != id:
+        raise HTTPException(status_code=403, detail="Can only export your own data")
+    
+    # Streamed to S3 after the response, poll the job for the download link
+    job_id = await create_export_job(id)
+    background_tasks.add_task(run_export, job_id, id)
+    return {"jobId": job_id, "status": "pending"}
+
+@router.get("/{id}/export/{jobId}", response_model=ExportJobResponse)
+async def get_data_export(
+    id: str,
+    jobId: str,
+    current_user: dict = Depends(verify_token)
+):
+    job = await get_export_job(jobId)
+    if not job or job["userId"] != id or current_user.get("id") != id:
+        raise HTTPException(status_code=404, detail="Export not found")
+    
+    download_url = get_export_download_url(job["key"]) if job["status"] == "done" else None
+    return {"jobId": jobId, "status": job["status"], "downloadUrl": download_url}
 
 @router.patch("/{id}/{friendId}", response_model=List[UserResponse])
 async def add_remove_friend(
     id: str, 
     friendId: str, 
+    background_tasks: BackgroundTasks,
     current_user: dict = Depends(verify_token)
 ):
     db = get_database()
@@ -89,6 +304,7 @@ async def add_remove_friend(
     
     user_friends = user.get("friends", [])
     friend_friends = friend.get("friends", [])
+    events = []
     
     if friendId in user_friends:
         # Remove friend
@@ -101,36 +317,52 @@ async def add_remove_friend(
         friend_friends.append(id)
         
         # Send notification
-        await publish_notification_event(
+        mutual = await count_mutual_friends(id, [friendId])
+        events.append(outbox_event(
             NotificationChannels.FRIEND_REQUEST,
             {
                 "userId": friendId,
                 "actorId": id,
                 "actorName": f"{user['firstName']} {user['lastName']}",
-                "actorPicture": user.get("picturePath", "")
+                "actorPicture": user.get("picturePath", ""),
+                "metadata": {
+                    "mutualFriends": mutual[friendId]
+                }
             }
-        )
+        ))
     
     # Update both users
-    await users_collection.update_one(
-        {"_id": ObjectId(id)},
-        {"$set": {"friends": user_friends}}
-    )
-    await users_collection.update_one(
-        {"_id": ObjectId(friendId)},
-        {"$set": {"friends": friend_friends}}
+    async with outbox_transaction() as session:
+        await users_collection.update_one(
+            {"_id": ObjectId(id)},
+            {"$set": {"friends": user_friends}},
+            session=session
+        )
+        await users_collection.update_one(
+            {"_id": ObjectId(friendId)},
+            {"$set": {"friends": friend_friends}},
+            session=session
+        )
+        await enqueue_events(events, session=session)
+    await bump_versions(
+        VersionKeys.user(id), VersionKeys.user(friendId),
+        VersionKeys.friends(id), VersionKeys.friends(friendId)
     )
+    await update_friend_sets(id, friendId, added=friendId in user_friends)
+    
+    # Friends-of-friends scores of everyone around the pair shift by one
+    user["friends"], friend["friends"] = user_friends, friend_friends
+    background_tasks.add_task(update_recommendations, user, friend, friendId in user_friends)
     
     # Return updated friends list
     friends = []
     for friend_id in user_friends:
         if ObjectId.is_valid(friend_id):
-            f = await users_collection.find_one({"_id": ObjectId(friend_id)})
+            f = await users_collection.find_one({"_id": ObjectId(friend_id)}, user_serializer.projection)
             if f:
-                f["_id"] = str(f["_id"])
                 friends.append(f)
     
-    return friends
+    return user_serializer.response(friends)
 
 @router.patch("/{id}/social", response_model=UserResponse)
 async def update_social_urls(
@@ -156,12 +388,15 @@ async def update_social_urls(
     if not result:
         raise HTTPException(status_code=404, detail="User not found")
     
+    # Friends lists embed this profile
+    await bump_versions(VersionKeys.user(id), *[VersionKeys.friends(f) for f in result.get("friends", [])])
+    
     result["_id"] = str(result["_id"])
     return result
 
 @router.post("/search", response_model=List[UserResponse])
 async def search_users(search: SearchRequest):
-    db = get_database()
+    db = get_read_database("search")
     users_collection = db.users
     
     if not search.query or not search.query.strip():
@@ -173,9 +408,6 @@ async def search_users(search: SearchRequest):
             {"firstName": {"$regex": search.query, "$options": "i"}},
             {"lastName": {"$regex": search.query, "$options": "i"}}
         ]
-    }).to_list(length=100)
-    
-    for user in users:
-        user["_id"] = str(user["_id"])
+    }, user_serializer.projection).to_list(length=100)
     
-    return users
\ No newline at end of file
+    return user_serializer.response(users)
\ No newline at end of file
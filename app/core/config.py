@@ -1,9 +1,19 @@
 from pydantic_settings import BaseSettings
-from typing import Optional
+from typing import Dict, List, Literal, Optional
+
+ReadPreferenceMode = Literal["primary", "primaryPreferred", "secondary", "secondaryPreferred", "nearest"]
 
 class Settings(BaseSettings):
     # MongoDB
     MONGO_URL: str
+    MONGO_MAX_POOL_SIZE: int = 100
+    MONGO_MIN_POOL_SIZE: int = 0
+    MONGO_MAX_IDLE_TIME_MS: Optional[int] = None
+    MONGO_WAIT_QUEUE_TIMEOUT_MS: Optional[int] = None
+    MONGO_COMPRESSORS: Optional[str] = None  # e.g. "zstd,snappy", needs zstandard/python-snappy
+    # Read preference for heavy read paths (feed, user_posts, tags, search, directory)
+    MONGO_READ_PREFERENCE: ReadPreferenceMode = "primary"
+    MONGO_READ_PREFERENCES: Dict[str, ReadPreferenceMode] = {}  # per-operation overrides
     
     # JWT
     JWT_SECRET: str
@@ -15,11 +25,81 @@ class Settings(BaseSettings):
     REDIS_PORT: int = 6379
     REDIS_PASSWORD: Optional[str] = None
     
+    # Notification events
+    # "streams" batches XADDs so the notification service can replay after downtime,
+    # "both" also publishes while consumers move over, "pubsub" is fire-and-forget
+    NOTIFICATION_TRANSPORT: Literal["pubsub", "streams", "both"] = "pubsub"
+    NOTIFICATION_STREAM_MAXLEN: int = 100000  # approximate, per channel stream
+    NOTIFICATION_BATCH_SIZE: int = 50  # events per pipelined flush
+    NOTIFICATION_BATCH_INTERVAL_MS: int = 20  # longest an event waits for its batch
+    
+    # Outbox relay for notification events
+    OUTBOX_TRANSACTIONS: bool = False  # needs a replica set
+    OUTBOX_BATCH_SIZE: int = 100
+    OUTBOX_POLL_INTERVAL_SECONDS: float = 1.0
+    OUTBOX_LEASE_SECONDS: int = 30  # a claimed batch is retried after this
+    
+    # Like notifications, one event per post and window
+    LIKE_AGGREGATION_WINDOW_SECONDS: int = 30
+    LIKE_AGGREGATION_RECENT_ACTORS: int = 3  # likers named in the event
+    LIKE_AGGREGATION_FLUSH_INTERVAL_SECONDS: float = 1.0
+    
     # AWS S3
     AWS_REGION: str
     AWS_ACCESS_KEY_ID: str
     AWS_SECRET_ACCESS_KEY: str
     AWS_S3_BUCKET_NAME: str
+    AWS_S3_ENDPOINT_URL: Optional[str] = None  # S3-compatible stand-in, e.g. http://localhost:9000
+    AWS_S3_PUBLIC_URL: Optional[str] = None  # Base URL objects are served from
+    
+    # Image variants
+    IMAGE_VARIANTS_ENABLED: bool = True
+    IMAGE_THUMBNAIL_SIZE: int = 150
+    IMAGE_VARIANT_WIDTHS: List[int] = [320, 640, 1080]
+    IMAGE_WEBP_QUALITY: int = 80
+    
+    # Response compression
+    COMPRESSION_MIN_SIZE: int = 1000  # bytes
+    FEED_PAGE_CACHE_TTL_SECONDS: int = 30
+    
+    # Hashtags
+    TAG_TIMELINE_LIMIT: int = 500  # newest posts kept per tag in Redis
+    TRENDING_BUCKET_SECONDS: int = 5 * 60
+    TRENDING_CACHE_SECONDS: int = 60
+    
+    # Seen posts (per user Bloom filters for the unseen feed)
+    SEEN_POSTS_CAPACITY: int = 5000  # posts per filter generation
+    SEEN_POSTS_FALSE_POSITIVE_RATE: float = 0.01
+    SEEN_POSTS_TTL_SECONDS: int = 60 * 60 * 24 * 30  # 30 days
+    UNSEEN_FEED_MAX_SCAN: int = 1000  # posts read per unseen page before handing back a cursor
+    
+    # Trending posts
+    TRENDING_HALF_LIFE_SECONDS: int = 6 * 60 * 60
+    TRENDING_POSTS_LIMIT: int = 5000
+    TRENDING_DECAY_INTERVAL_SECONDS: int = 60 * 60  # 1 hour
+    
+    # Profile cache
+    PROFILE_CACHE_TTL_SECONDS: int = 60 * 5  # 5 minutes
+    PROFILE_CACHE_STALE_SECONDS: int = 60  # served while one instance refreshes
+    
+    # User cards (batch lookups)
+    USER_CARD_CACHE_TTL_SECONDS: int = 60 * 60  # 1 hour
+    
+    # Data export
+    EXPORT_JOB_TTL_SECONDS: int = 60 * 60 * 24 * 7  # 7 days
+    EXPORT_SPOOL_MAX_BYTES: int = 8 * 1024 * 1024  # buffered in memory up to this, then on disk
+    EXPORT_DOWNLOAD_URL_EXPIRES_SECONDS: int = 60 * 60
+    
+    # Friend graph
+    FRIEND_SET_CACHE_TTL_SECONDS: int = 60 * 60  # 1 hour
+    RECOMMENDATION_LIMIT: int = 100  # candidates kept per user
+    RECOMMENDATION_TTL_SECONDS: int = 60 * 60 * 24 * 7  # full rebuild weekly
+    RECOMMENDATION_EMPTY_TTL_SECONDS: int = 60 * 10  # users with nobody to suggest are rebuilt after this
+    
+    # Orphaned upload reaper
+    UPLOAD_REAPER_ENABLED: bool = True
+    UPLOAD_GRACE_PERIOD_SECONDS: int = 60 * 60 * 24  # 1 day
+    UPLOAD_REAPER_INTERVAL_SECONDS: int = 60 * 60  # 1 hour
     
     # Email
     EMAIL_USER: str
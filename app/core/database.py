@@ -1,13 +1,21 @@
+import asyncio
 from motor.motor_asyncio import AsyncIOMotorClient
 from app.core.config import settings
+from app.core.indexes import ensure_indexes
+from unilink_shared.database import ReadDatabases, client_options
 
 client: AsyncIOMotorClient = None
 database = None
+index_task: asyncio.Task = None
+_read_databases = ReadDatabases(settings)
 
 async def init_db():
-    global client, database
-    client = AsyncIOMotorClient(settings.MONGO_URL)
+    global client, database, index_task
+    client = AsyncIOMotorClient(settings.MONGO_URL, **client_options(settings))
     database = client.get_database()
+    _read_databases.clear()
+    # Reconcile indexes without holding up startup
+    index_task = asyncio.create_task(ensure_indexes(database))
     print("✅ MongoDB connected")
 
 async def close_db():
@@ -16,4 +24,9 @@ async def close_db():
         client.close()
 
 def get_database():
-    return database
\ No newline at end of file
+    return database
+
+def get_read_database(operation: str):
+    """Database for heavy read paths that tolerate replication lag"""
+    # Read-your-writes paths keep using get_database(), which reads from the primary
+    return _read_databases.get(database, operation)
@@ -0,0 +1,73 @@
+import hashlib
+import time
+from typing import Optional
+from fastapi import Request, Response
+from app.core.redis_client import get_redis
+
+class VersionKeys:
+    """Redis counters bumped whenever the matching resource changes"""
+    POSTS = "version:posts"
+
+    @staticmethod
+    def user(user_id: str) -> str:
+        return f"version:user:{user_id}"
+
+    @staticmethod
+    def friends(user_id: str) -> str:
+        return f"version:friends:{user_id}"
+
+def _epoch() -> int:
+    # Counters start from the current time so a flushed Redis never reuses old ETags
+    return int(time.time() * 1000)
+
+async def bump_versions(*keys: str):
+    """Invalidate ETags for resources, call only after the Mongo write succeeded"""
+    if not keys:
+        return
+    try:
+        pipe = get_redis().pipeline()
+        for key in keys:
+            pipe.set(key, _epoch(), nx=True)
+            pipe.incr(key)
+        await pipe.execute()
+    except Exception as e:
+        print(f"❌ Error bumping versions {keys}: {e}")
+
+async def get_etag(request: Request, *keys: str) -> Optional[str]:
+    """Weak ETag for the resource versions and the representation asked for"""
+    try:
+        redis = get_redis()
+        versions = await redis.mget(keys)
+        missing = [key for key, version in zip(keys, versions) if version is None]
+        if missing:
+            pipe = redis.pipeline()
+            for key in missing:
+                pipe.set(key, _epoch(), nx=True)
+            await pipe.execute()
+            versions = await redis.mget(keys)
+    except Exception as e:
+        # Without a version we simply skip conditional handling
+        print(f"❌ Error reading versions {keys}: {e}")
+        return None
+    representation = hashlib.md5(f"{'+'.join(keys)}?{request.url.query}".encode()).hexdigest()[:12]
+    return f'W/"{".".join(versions)}-{representation}"'
+
+def _opaque(tag: str) -> str:
+    tag = tag.strip()
+    return tag[2:] if tag.startswith("W/") else tag
+
+def not_modified(request: Request, etag: Optional[str]) -> Optional[Response]:
+    """304 response if the client already holds this version, else None"""
+    if_none_match = request.headers.get("if-none-match")
+    if not etag or not if_none_match:
+        return None
+    tags = {_opaque(tag) for tag in if_none_match.split(",")}
+    if "*" in tags or _opaque(etag) in tags:
+        return Response(status_code=304, headers=cache_headers(etag))
+    return None
+
+def cache_headers(etag: Optional[str]) -> dict:
+    if not etag:
+        return {}
+    # Clients may keep the body but must revalidate before every use
+    return {"ETag": etag, "Cache-Control": "private, no-cache"}
@@ -0,0 +1,85 @@
+import asyncio
+import sys
+from datetime import datetime
+from typing import List
+from bson import ObjectId
+from pymongo import ASCENDING, DESCENDING, IndexModel
+from unilink_shared import indexes as shared_indexes
+
+# Collection -> indexes it must have
+INDEXES = {
+    "users": [
+        IndexModel([("email", ASCENDING)], name="email_unique", unique=True, background=True),
+        IndexModel([("discordId", ASCENDING)], name="discordId", sparse=True, background=True),
+        IndexModel([("picturePath", ASCENDING)], name="picturePath", background=True),
+        # Alumni directory filters, newest members first
+        IndexModel([("Year", ASCENDING), ("location", ASCENDING), ("_id", DESCENDING)], name="Year_location_id", background=True),
+        IndexModel([("Year", ASCENDING), ("_id", DESCENDING)], name="Year_id", background=True),
+        IndexModel([("location", ASCENDING), ("_id", DESCENDING)], name="location_id", background=True),
+    ],
+    "posts": [
+        IndexModel([("userId", ASCENDING), ("createdAt", DESCENDING), ("_id", DESCENDING)], name="userId_createdAt_id", background=True),
+        # Unseen feed pages through posts newest first
+        IndexModel([("createdAt", DESCENDING), ("_id", DESCENDING)], name="createdAt_id", background=True),
+        IndexModel([("picturePath", ASCENDING)], name="picturePath", background=True),
+        IndexModel([("hashtags", ASCENDING), ("createdAt", DESCENDING), ("_id", DESCENDING)], name="hashtags_createdAt_id", background=True),
+        IndexModel([("mentions", ASCENDING), ("createdAt", DESCENDING), ("_id", DESCENDING)], name="mentions_createdAt_id", background=True),
+    ],
+    "otps": [
+        IndexModel([("email", ASCENDING)], name="email", background=True),
+    ],
+    "images": [
+        IndexModel([("key", ASCENDING)], name="key_unique", unique=True, background=True),
+    ],
+    "outbox": [
+        # Relay scans pending events oldest first, published ones expire after a week
+        IndexModel([("publishedAt", ASCENDING), ("createdAt", ASCENDING)], name="publishedAt_createdAt", background=True),
+        IndexModel([("publishedAt", ASCENDING)], name="publishedAt_ttl", expireAfterSeconds=60 * 60 * 24 * 7, background=True),
+    ],
+}
+
+# Query shapes issued by the API: (collection, filter, sort)
+QUERY_SHAPES = [
+    ("users", {"email": "user@example.com"}, None),
+    ("users", {"discordId": "0"}, None),
+    ("users", {"picturePath": {"$in": ["https://example.com/a.png"]}}, None),
+    ("users", {"Year": "2024"}, None),
+    ("users", {"Year": "2024", "location": "Delhi"}, [("_id", DESCENDING)]),
+    ("users", {"Year": "2024", "_id": {"$lt": ObjectId("000000000000000000000000")}}, [("_id", DESCENDING)]),
+    ("users", {"location": "Delhi"}, [("_id", DESCENDING)]),
+    ("posts", {"userId": "000000000000000000000000"}, [("createdAt", DESCENDING), ("_id", DESCENDING)]),
+    ("posts", {"userId": "000000000000000000000000", "createdAt": {"$lt": datetime(2024, 1, 1)}}, [("createdAt", DESCENDING), ("_id", DESCENDING)]),
+    ("posts", {"userId": {"$in": ["000000000000000000000000", "000000000000000000000001"]}}, [("createdAt", DESCENDING)]),
+    ("posts", {"userId": {"$in": ["000000000000000000000000", "000000000000000000000001"]}}, [("createdAt", DESCENDING), ("_id", DESCENDING)]),
+    ("posts", {}, [("createdAt", DESCENDING), ("_id", DESCENDING)]),
+    ("posts", {"picturePath": {"$in": ["https://example.com/a.png"]}}, None),
+    ("posts", {"hashtags": "python", "createdAt": {"$lt": datetime(2024, 1, 1)}}, [("createdAt", DESCENDING), ("_id", DESCENDING)]),
+    ("posts", {"mentions": "alice"}, [("createdAt", DESCENDING), ("_id", DESCENDING)]),
+    ("otps", {"email": "user@example.com"}, None),
+    ("images", {"key": "posts/a.png"}, None),
+    ("outbox", {"publishedAt": None}, [("createdAt", ASCENDING)]),
+]
+
+async def ensure_indexes(db) -> List[str]:
+    """Create missing indexes, returns a description of any drift found"""
+    return await shared_indexes.ensure_indexes(db, INDEXES)
+
+async def check_query_plans(db) -> List[str]:
+    """Explain every known query shape, raises if any uses a COLLSCAN"""
+    return await shared_indexes.check_query_plans(db, QUERY_SHAPES)
+
+async def _main(check: bool):
+    from app.core import database
+
+    await database.init_db()
+    try:
+        await database.index_task
+        if check:
+            await check_query_plans(database.get_database())
+            print("✅ All query shapes use an index")
+    finally:
+        await database.close_db()
+
+# python -m app.core.indexes [--check]
+if __name__ == "__main__":
+    asyncio.run(_main(check="--check" in sys.argv))
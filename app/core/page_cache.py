@@ -0,0 +1,73 @@
+import asyncio
+import gzip
+from typing import Dict, Optional
+import brotli
+from fastapi import Response
+from app.core.config import settings
+from app.core.redis_client import get_redis_binary
+
+# Encodings pages are stored in, in order of preference
+ENCODINGS = ("br", "gzip")
+
+def negotiate_encoding(accept_encoding: str) -> Optional[str]:
+    """Best stored encoding the client accepts, None for identity"""
+    accepted = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        quality = 1.0
+        if params.strip().startswith("q="):
+            try:
+                quality = float(params.strip()[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[name.strip().lower()] = quality
+
+    for encoding in ENCODINGS:
+        if accepted.get(encoding, accepted.get("*", 0)) > 0:
+            return encoding
+    return None
+
+def _compress_sync(body: bytes) -> Dict[str, bytes]:
+    return {
+        "br": brotli.compress(body, quality=5),
+        "gzip": gzip.compress(body, compresslevel=6),
+    }
+
+async def compress_page(body: bytes) -> Dict[str, bytes]:
+    # Large feed pages take milliseconds to compress, keep that off the event loop
+    return await asyncio.to_thread(_compress_sync, body)
+
+def _page_key(namespace: str, etag: str, encoding: str) -> str:
+    # The ETag already identifies the version and the query that built the page
+    version = etag.removeprefix("W/").strip('"')
+    return f"page:{namespace}:{version}:{encoding}"
+
+async def get_cached_page(namespace: str, etag: str, encoding: Optional[str]) -> Optional[bytes]:
+    """Stored page body in the requested encoding (identity is decoded from gzip)"""
+    try:
+        body = await get_redis_binary().get(_page_key(namespace, etag, encoding or "gzip"))
+    except Exception as e:
+        print(f"❌ Error reading cached {namespace} page: {e}")
+        return None
+    if body is not None and encoding is None:
+        return gzip.decompress(body)
+    return body
+
+async def cache_page(namespace: str, etag: str, body: bytes) -> Dict[str, bytes]:
+    """Compress a page into every stored encoding and cache it briefly"""
+    pages = await compress_page(body)
+    try:
+        pipe = get_redis_binary().pipeline()
+        for encoding, compressed in pages.items():
+            pipe.set(_page_key(namespace, etag, encoding), compressed, ex=settings.FEED_PAGE_CACHE_TTL_SECONDS)
+        await pipe.execute()
+    except Exception as e:
+        print(f"❌ Error caching {namespace} page: {e}")
+    return pages
+
+def encoded_response(body: bytes, encoding: Optional[str], headers: Optional[dict] = None) -> Response:
+    """JSON response for an already encoded body"""
+    response_headers = {"Vary": "Accept-Encoding", **(headers or {})}
+    if encoding:
+        response_headers["Content-Encoding"] = encoding
+    return Response(content=body, media_type="application/json", headers=response_headers)
@@ -1,8 +1,10 @@
 import redis.asyncio as aioredis
 from app.core.config import settings
-import json
+from unilink_shared.event_stream import NotificationProducer
 
 redis_client: aioredis.Redis = None
+# Raw bytes client for binary payloads such as compressed pages
+redis_binary: aioredis.Redis = None
 
 class NotificationChannels:
     LIKE = "notification:like"
@@ -12,25 +14,42 @@ class NotificationChannels:
     FRIEND_REQUEST = "notification:friend-request"
 
 async def init_redis():
-    global redis_client
+    global redis_client, redis_binary
     redis_client = await aioredis.from_url(
         f"redis://{settings.REDIS_HOST}:{settings.REDIS_PORT}",
         password=settings.REDIS_PASSWORD,
         decode_responses=True
     )
+    redis_binary = await aioredis.from_url(
+        f"redis://{settings.REDIS_HOST}:{settings.REDIS_PORT}",
+        password=settings.REDIS_PASSWORD
+    )
     print("✅ Redis connected")
 
 async def close_redis():
-    global redis_client
+    global redis_client, redis_binary
     if redis_client:
         await redis_client.close()
+    if redis_binary:
+        await redis_binary.close()
 
 def get_redis():
     return redis_client
 
+def get_redis_binary():
+    return redis_binary
+
+notification_producer = NotificationProducer(
+    get_redis,
+    transport=settings.NOTIFICATION_TRANSPORT,
+    max_len=settings.NOTIFICATION_STREAM_MAXLEN,
+    batch_size=settings.NOTIFICATION_BATCH_SIZE,
+    flush_interval_ms=settings.NOTIFICATION_BATCH_INTERVAL_MS,
+)
+
 async def publish_notification_event(channel: str, data: dict):
     try:
-        await redis_client.publish(channel, json.dumps(data))
+        await notification_producer.publish(channel, data)
         print(f"📢 Published notification event to {channel}")
     except Exception as e:
         print(f"❌ Error publishing to {channel}: {e}")
\ No newline at end of file
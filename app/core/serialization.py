@@ -0,0 +1,34 @@
+from typing import Iterable, Optional, Type
+from pydantic import BaseModel
+from pydantic_core import PydanticUndefined
+from unilink_shared.serialization import BSONJSONResponse, dumps
+
+class ModelSerializer:
+    """Shapes raw Mongo documents like a response model, without validating them.
+
+    Only use it for documents the API wrote itself - it copies the model's
+    fields and defaults but skips all coercion.
+    """
+
+    def __init__(self, model: Type[BaseModel], extra_fields: Iterable[str] = ()):
+        self.fields = []
+        for name, field in model.model_fields.items():
+            default = None
+            if field.default_factory is not None:
+                default = field.default_factory()
+            elif field.default is not PydanticUndefined:
+                default = field.default
+            self.fields.append((field.alias or name, default))
+
+        # Fetch only what is rendered (plus fields needed to post-process docs)
+        self.projection = {key: 1 for key, _ in self.fields}
+        self.projection.update({field: 1 for field in extra_fields})
+
+    def dump(self, doc: dict) -> dict:
+        return {key: doc.get(key, default) for key, default in self.fields}
+
+    def dump_many(self, docs: Iterable[dict]) -> list:
+        return [self.dump(doc) for doc in docs]
+
+    def response(self, docs: Iterable[dict], status_code: int = 200, headers: Optional[dict] = None) -> BSONJSONResponse:
+        return BSONJSONResponse(self.dump_many(docs), status_code=status_code, headers=headers)
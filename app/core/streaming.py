@@ -0,0 +1,25 @@
+from typing import AsyncIterator, Callable, Optional
+from fastapi import Request
+from fastapi.responses import StreamingResponse
+from app.core.serialization import dumps
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+# Documents fetched from Mongo per round trip while streaming
+STREAM_BATCH_SIZE = 100
+
+def wants_ndjson(request: Request) -> bool:
+    return NDJSON_MEDIA_TYPE in request.headers.get("accept", "")
+
+async def ndjson_lines(cursor, transform: Optional[Callable[[dict], Optional[dict]]] = None) -> AsyncIterator[bytes]:
+    """One JSON line per document, at most a batch of documents in memory"""
+    async for doc in cursor.batch_size(STREAM_BATCH_SIZE):
+        if transform:
+            doc = transform(doc)
+            if doc is None:
+                continue
+        yield dumps(doc) + b"\n"
+
+def ndjson_response(cursor, transform: Optional[Callable[[dict], Optional[dict]]] = None, headers: Optional[dict] = None) -> StreamingResponse:
+    """Stream a Motor cursor as NDJSON, the first documents go out before the last are read"""
+    return StreamingResponse(ndjson_lines(cursor, transform), media_type=NDJSON_MEDIA_TYPE, headers=headers)
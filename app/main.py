@@ -1,12 +1,22 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.staticfiles import StaticFiles
 from contextlib import asynccontextmanager
+import asyncio
 import os
 from dotenv import load_dotenv
 
 from app.core.database import init_db, close_db
-from app.core.redis_client import init_redis, close_redis
+from app.core.redis_client import init_redis, close_redis, notification_producer
+from app.core.config import settings
+from unilink_shared.metrics import mongo_pool_metrics
+from unilink_shared.singleflight import singleflight
+from app.core.cache import cache_snapshot
+from app.utils.upload_reaper import run_upload_reaper
+from app.utils.trending import run_trending_decay
+from app.utils.like_aggregation import run_like_aggregation
+from app.core.outbox import run_outbox_relay
 from app.api import auth, users, posts, s3, otp, captions
 
 load_dotenv()
@@ -17,8 +27,17 @@ async def lifespan(app: FastAPI):
     await init_db()
     await init_redis()
     print("✅ MongoDB and Redis connected")
+    background_jobs = []
+    if settings.UPLOAD_REAPER_ENABLED:
+        background_jobs.append(asyncio.create_task(run_upload_reaper()))
+    background_jobs.append(asyncio.create_task(run_trending_decay()))
+    background_jobs.append(asyncio.create_task(run_outbox_relay()))
+    background_jobs.append(asyncio.create_task(run_like_aggregation()))
     yield
     # Shutdown
+    for job in background_jobs:
+        job.cancel()
+    await notification_producer.close()
     await close_db()
     await close_redis()
     print("👋 Connections closed")
@@ -32,8 +51,12 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
+# Compress remaining JSON responses, pre-encoded feed pages pass through untouched
+app.add_middleware(GZipMiddleware, minimum_size=settings.COMPRESSION_MIN_SIZE)
+
 # Static files (for backward compatibility)
 if os.path.exists("public/assets"):
     app.mount("/assets", StaticFiles(directory="public/assets"), name="assets")
@@ -49,3 +72,12 @@ app.include_router(captions.router, prefix="/captions", tags=["captions"])
 @app.get("/")
 async def root():
     return {"message": "🚀 UniLink API is running"}
+
+@app.get("/metrics")
+async def metrics():
+    return {
+        "mongoPool": mongo_pool_metrics.snapshot(),
+        "singleflight": singleflight.snapshot(),
+        "cache": cache_snapshot(),
+        "notifications": notification_producer.snapshot(),
+    }
@@ -1,7 +1,6 @@
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, EmailStr, Field
 from datetime import datetime
 from typing import Dict, Optional
-from bson import ObjectId
 from app.models.user import PyObjectId
 
 class OTPCreate(BaseModel):
@@ -23,5 +22,3 @@ class OTPInDB(BaseModel):
 
     class Config:
         populate_by_name = True
-        arbitrary_types_allowed = True
-        json_encoders = {ObjectId: str}
\ No newline at end of file
@@ -1,7 +1,6 @@
 from pydantic import BaseModel, Field
 from typing import Dict, List, Optional
 from datetime import datetime
-from bson import ObjectId
 from app.models.user import PyObjectId
 
 class PostCreate(BaseModel):
@@ -20,13 +19,13 @@ class PostInDB(BaseModel):
     userPicturePath: Optional[str] = ""
     likes: Dict[str, bool] = {}
     comments: List[str] = []
+    hashtags: List[str] = []
+    mentions: List[str] = []
     createdAt: datetime = Field(default_factory=datetime.utcnow)
     updatedAt: datetime = Field(default_factory=datetime.utcnow)
 
     class Config:
         populate_by_name = True
-        arbitrary_types_allowed = True
-        json_encoders = {ObjectId: str}
 
 class PostResponse(BaseModel):
     id: str = Field(alias="_id")
@@ -39,6 +38,8 @@ class PostResponse(BaseModel):
     userPicturePath: Optional[str] = ""
     likes: Dict[str, bool] = {}
     comments: List[str] = []
+    hashtags: List[str] = []
+    mentions: List[str] = []
     createdAt: datetime
     updatedAt: datetime
 
@@ -1,22 +1,7 @@
 from pydantic import BaseModel, EmailStr, Field
 from typing import Optional, List
 from datetime import datetime
-from bson import ObjectId
-
-class PyObjectId(ObjectId):
-    @classmethod
-    def __get_validators__(cls):
-        yield cls.validate
-
-    @classmethod
-    def validate(cls, v):
-        if not ObjectId.is_valid(v):
-            raise ValueError("Invalid ObjectId")
-        return ObjectId(v)
-
-    @classmethod
-    def __get_pydantic_json_schema__(cls, _schema_generator):
-        return {"type": "string"}
+from unilink_shared.models import PyObjectId
 
 class UserBase(BaseModel):
     email: EmailStr
@@ -37,6 +22,7 @@ class UserInDB(UserBase):
     friends: List[str] = []
     viewedProfile: int = 0
     impressions: int = 0
+    postCount: int = 0
     provider: str = "local"
     discordId: Optional[str] = None
     discordUsername: Optional[str] = ""
@@ -47,14 +33,13 @@ class UserInDB(UserBase):
 
     class Config:
         populate_by_name = True
-        arbitrary_types_allowed = True
-        json_encoders = {ObjectId: str}
 
 class UserResponse(UserBase):
     id: str = Field(alias="_id")
     friends: List[str] = []
     viewedProfile: int = 0
     impressions: int = 0
+    postCount: int = 0
     discordUsername: Optional[str] = ""
 
     class Config:
@@ -0,0 +1,19 @@
+import os
+
+# Settings has required fields, give them placeholders so app modules import without a .env
+for name, value in {
+    "MONGO_URL": "mongodb://localhost:27017/unilink",
+    "JWT_SECRET": "test",
+    "AWS_REGION": "us-east-1",
+    "AWS_ACCESS_KEY_ID": "test",
+    "AWS_SECRET_ACCESS_KEY": "test",
+    "AWS_S3_BUCKET_NAME": "test-bucket",
+    "EMAIL_USER": "test",
+    "EMAIL_PASSWORD": "test",
+    "GEMINI_API_KEY": "test",
+    "DISCORD_CLIENT_ID": "test",
+    "DISCORD_CLIENT_SECRET": "test",
+    "DISCORD_REDIRECT_URI": "http://localhost/callback",
+    "SESSION_SECRET": "test",
+}.items():
+    os.environ.setdefault(name, value)
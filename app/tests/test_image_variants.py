@@ -0,0 +1,89 @@
+import io
+import pytest
+from PIL import Image
+from app.core.config import settings
+from app.utils.image_variants import THUMBNAIL, apply_image_size, render_variants, select_variant_url
+from app.utils.s3_utils import get_public_url
+
+ORIGINAL = "https://example.com/posts/original.jpg"
+VARIANTS = {
+    THUMBNAIL: "variants/posts/original/thumb.webp",
+    "w320": "variants/posts/original/w320.webp",
+    "w640": "variants/posts/original/w640.webp",
+}
+
+@pytest.fixture(autouse=True)
+def variant_settings(monkeypatch):
+    monkeypatch.setattr(settings, "IMAGE_THUMBNAIL_SIZE", 150)
+    monkeypatch.setattr(settings, "IMAGE_VARIANT_WIDTHS", [320, 640, 1080])
+
+def _png(width: int, height: int, mode: str = "RGB") -> bytes:
+    buffer = io.BytesIO()
+    Image.new(mode, (width, height)).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+def _size(data: bytes):
+    with Image.open(io.BytesIO(data)) as image:
+        assert image.format == "WEBP"
+        return image.size
+
+def test_render_variants_keeps_aspect_ratio_and_square_thumbnail():
+    variants = render_variants(_png(800, 400))
+
+    assert set(variants) == {THUMBNAIL, "w320", "w640"}
+    assert _size(variants[THUMBNAIL]) == (150, 150)
+    assert _size(variants["w320"]) == (320, 160)
+    assert _size(variants["w640"]) == (640, 320)
+
+def test_render_variants_never_upscales():
+    assert set(render_variants(_png(320, 200))) == {THUMBNAIL}
+    assert set(render_variants(_png(100, 100))) == {THUMBNAIL}
+
+def test_render_variants_converts_palette_images():
+    variants = render_variants(_png(400, 400, mode="P"))
+
+    assert set(variants) == {THUMBNAIL, "w320"}
+
+@pytest.mark.parametrize("width", [None, 0])
+def test_select_variant_url_without_width_is_original(width):
+    assert select_variant_url(ORIGINAL, VARIANTS, width) == ORIGINAL
+
+@pytest.mark.parametrize("variants", [None, {}])
+def test_select_variant_url_without_variants_is_original(variants):
+    assert select_variant_url(ORIGINAL, variants, 320) == ORIGINAL
+
+@pytest.mark.parametrize("width", [1, 100, 150])
+def test_select_variant_url_picks_thumbnail_for_small_widths(width):
+    assert select_variant_url(ORIGINAL, VARIANTS, width) == get_public_url(VARIANTS[THUMBNAIL])
+
+@pytest.mark.parametrize("width, name", [(151, "w320"), (320, "w320"), (321, "w640"), (640, "w640")])
+def test_select_variant_url_picks_smallest_wide_enough_variant(width, name):
+    assert select_variant_url(ORIGINAL, VARIANTS, width) == get_public_url(VARIANTS[name])
+
+def test_select_variant_url_falls_back_to_original_when_no_variant_is_wide_enough():
+    assert select_variant_url(ORIGINAL, VARIANTS, 641) == ORIGINAL
+
+def test_select_variant_url_without_thumbnail_uses_width_variants():
+    variants = {name: key for name, key in VARIANTS.items() if name != THUMBNAIL}
+
+    assert select_variant_url(ORIGINAL, variants, 100) == get_public_url(variants["w320"])
+
+def test_apply_image_size_leaves_input_untouched():
+    post = {
+        "picturePath": ORIGINAL,
+        "pictureVariants": VARIANTS,
+        "userPicturePath": "https://example.com/users/avatar.jpg",
+        "userPictureVariants": {THUMBNAIL: "variants/users/avatar/thumb.webp"},
+    }
+    before = dict(post)
+
+    sized = apply_image_size(post, 300)
+
+    assert post == before
+    assert sized["picturePath"] == get_public_url(VARIANTS["w320"])
+    assert sized["userPicturePath"] == get_public_url("variants/users/avatar/thumb.webp")
+
+def test_apply_image_size_without_width_returns_document():
+    post = {"picturePath": ORIGINAL, "pictureVariants": VARIANTS}
+
+    assert apply_image_size(post, None) is post
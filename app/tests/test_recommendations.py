@@ -0,0 +1,50 @@
+import asyncio
+import fakeredis
+import mongomock_motor
+import pytest
+from app.utils import recommendations
+from app.utils.recommendations import empty_recommendations_key, get_recommendations
+
+@pytest.fixture
+def stores(monkeypatch):
+    redis = fakeredis.FakeAsyncRedis(decode_responses=True)
+    db = mongomock_motor.AsyncMongoMockClient()["unilink"]
+    monkeypatch.setattr(recommendations, "get_redis", lambda: redis)
+    monkeypatch.setattr(recommendations, "get_database", lambda: db)
+    return redis, db
+
+def test_empty_result_is_cached(stores, monkeypatch):
+    redis, db = stores
+    builds = []
+    build = recommendations.build_recommendations
+
+    async def counting_build(user_id):
+        builds.append(user_id)
+        return await build(user_id)
+
+    monkeypatch.setattr(recommendations, "build_recommendations", counting_build)
+
+    async def scenario():
+        result = await db.users.insert_one({"friends": [], "Year": "", "location": ""})
+        user_id = str(result.inserted_id)
+        first = await get_recommendations(user_id, 10)
+        second = await get_recommendations(user_id, 10)
+        return user_id, first, second, await redis.ttl(empty_recommendations_key(user_id))
+
+    user_id, first, second, ttl = asyncio.run(scenario())
+
+    assert first == second == []
+    assert builds == [user_id]
+    assert ttl > 0
+
+def test_same_year_users_are_recommended(stores):
+    redis, db = stores
+
+    async def scenario():
+        user = await db.users.insert_one({"friends": [], "Year": "2020", "location": ""})
+        other = await db.users.insert_one({"friends": [], "Year": "2020", "location": ""})
+        return str(other.inserted_id), await get_recommendations(str(user.inserted_id), 10)
+
+    other_id, recommended = asyncio.run(scenario())
+
+    assert recommended == [other_id]
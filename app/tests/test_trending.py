@@ -0,0 +1,58 @@
+import asyncio
+import fakeredis
+import pytest
+from app.core.config import settings
+from app.utils import trending
+from app.utils.trending import (
+    POST_WEIGHT, TRENDING_POSTS_KEY, record_engagement, record_like_engagement
+)
+
+HOUR = 60 * 60
+
+@pytest.fixture
+def redis(monkeypatch):
+    client = fakeredis.FakeAsyncRedis(decode_responses=True)
+    monkeypatch.setattr(trending, "get_redis", lambda: client)
+    monkeypatch.setattr(settings, "TRENDING_HALF_LIFE_SECONDS", 6 * HOUR)
+    return client
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1_700_000_000.0]
+    monkeypatch.setattr(trending.time, "time", lambda: now[0])
+    return now
+
+def test_late_unlike_takes_back_only_its_own_like(redis, clock):
+    async def scenario():
+        await record_engagement("popular", POST_WEIGHT)
+        await record_engagement("quiet", POST_WEIGHT)
+        for user_id in ("u1", "u2", "u3"):
+            await record_like_engagement("popular", user_id, True)
+
+        clock[0] += 18 * HOUR
+        await record_like_engagement("popular", "u1", False)
+        return dict(await redis.zrange(TRENDING_POSTS_KEY, 0, -1, withscores=True))
+
+    scores = asyncio.run(scenario())
+
+    assert scores["popular"] == pytest.approx(3.0)
+    assert scores["quiet"] == pytest.approx(1.0)
+
+def test_unlike_right_after_like_restores_score(redis, clock):
+    async def scenario():
+        await record_engagement("post", POST_WEIGHT)
+        clock[0] += HOUR
+        await record_like_engagement("post", "u1", True)
+        await record_like_engagement("post", "u1", False)
+        return await redis.zscore(TRENDING_POSTS_KEY, "post")
+
+    assert asyncio.run(scenario()) == pytest.approx(1.0)
+
+def test_unlike_without_a_scored_like_changes_nothing(redis, clock):
+    async def scenario():
+        await record_engagement("post", POST_WEIGHT)
+        await record_like_engagement("post", "u1", False)
+        await record_like_engagement("post", "u1", False)
+        return await redis.zscore(TRENDING_POSTS_KEY, "post")
+
+    assert asyncio.run(scenario()) == pytest.approx(1.0)
@@ -0,0 +1,75 @@
+import asyncio
+import secrets
+import tempfile
+import time
+from typing import Optional
+from bson import ObjectId
+from app.core.config import settings
+from app.core.database import get_database
+from app.core.redis_client import get_redis
+from app.core.streaming import NDJSON_MEDIA_TYPE, ndjson_lines
+from app.utils.s3_utils import s3_client
+from app.utils.user_cards import CARD_PROJECTION, build_user_card
+
+def export_job_key(job_id: str) -> str:
+    return f"export:{job_id}"
+
+async def create_export_job(user_id: str) -> str:
+    job_id = secrets.token_hex(12)
+    key = export_job_key(job_id)
+    pipe = get_redis().pipeline()
+    pipe.hset(key, mapping={"userId": user_id, "status": "pending", "createdAt": int(time.time())})
+    pipe.expire(key, settings.EXPORT_JOB_TTL_SECONDS)
+    await pipe.execute()
+    return job_id
+
+async def get_export_job(job_id: str) -> Optional[dict]:
+    job = await get_redis().hgetall(export_job_key(job_id))
+    return job or None
+
+async def _set_status(job_id: str, **fields):
+    await get_redis().hset(export_job_key(job_id), mapping=fields)
+
+def _tagged(kind: str, transform=None):
+    def tag(doc: dict) -> dict:
+        return {"type": kind, **(transform(doc) if transform else doc)}
+    return tag
+
+async def run_export(job_id: str, user_id: str):
+    """Background task: write the user's profile, posts, friends and sent messages to S3 as NDJSON"""
+    db = get_database()
+    object_key = f"exports/{user_id}/{job_id}.ndjson"
+    try:
+        await _set_status(job_id, status="running")
+        user = await db.users.find_one({"_id": ObjectId(user_id)}, {"friends": 1})
+        friend_ids = [ObjectId(f) for f in (user or {}).get("friends", []) if ObjectId.is_valid(f)]
+        sections = [
+            (db.users.find({"_id": ObjectId(user_id)}, {"password": 0}), _tagged("profile")),
+            (db.posts.find({"userId": user_id}).sort("createdAt", 1), _tagged("post")),
+            (db.users.find({"_id": {"$in": friend_ids}}, CARD_PROJECTION), _tagged("friend", build_user_card)),
+            (db.messages.find({"sender": ObjectId(user_id)}).sort("createdAt", 1), _tagged("message")),
+        ]
+
+        # Same streaming path as the NDJSON endpoints, spilled to disk past the threshold
+        with tempfile.SpooledTemporaryFile(max_size=settings.EXPORT_SPOOL_MAX_BYTES) as out:
+            for cursor, transform in sections:
+                async for line in ndjson_lines(cursor, transform):
+                    out.write(line)
+            out.seek(0)
+            await asyncio.to_thread(
+                s3_client.upload_fileobj, out, settings.AWS_S3_BUCKET_NAME, object_key,
+                ExtraArgs={"ContentType": NDJSON_MEDIA_TYPE}
+            )
+
+        await _set_status(job_id, status="done", key=object_key)
+        print(f"📦 Exported data of user {user_id}")
+    except Exception as e:
+        print(f"❌ Error exporting data of user {user_id}: {e}")
+        await _set_status(job_id, status="failed")
+
+def get_export_download_url(object_key: str) -> str:
+    return s3_client.generate_presigned_url(
+        'get_object',
+        Params={'Bucket': settings.AWS_S3_BUCKET_NAME, 'Key': object_key},
+        ExpiresIn=settings.EXPORT_DOWNLOAD_URL_EXPIRES_SECONDS
+    )
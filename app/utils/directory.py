@@ -0,0 +1,97 @@
+from typing import Dict, List, Optional, Tuple
+from app.core.database import get_database
+from app.core.redis_client import get_redis
+
+# Facet fields shown in the alumni directory
+FACETS = ("Year", "location")
+
+FACETS_BUILT_KEY = "directory:facets:built"
+FACETS_LOCK_KEY = "directory:facets:lock"
+
+def _facet_hash(facet: str, other: Optional[Tuple[str, str]] = None) -> str:
+    # Counts of one facet, optionally within a value of the other facet
+    if other is None:
+        return f"directory:facets:{facet}"
+    return f"directory:facets:{facet}:{other[0]}:{other[1]}"
+
+def _facet_fields(user: dict) -> List[Tuple[str, str]]:
+    """(hash, field) pairs a user is counted under, empty values count under ''"""
+    year, location = user.get("Year") or "", user.get("location") or ""
+    return [
+        (_facet_hash("Year"), year),
+        (_facet_hash("location"), location),
+        (_facet_hash("Year", ("location", location)), year),
+        (_facet_hash("location", ("Year", year)), location),
+    ]
+
+async def update_directory_facets(before: Optional[dict], after: Optional[dict]):
+    """Move a user between facet counts, pass None for a created or deleted user"""
+    removed = _facet_fields(before) if before else []
+    added = _facet_fields(after) if after else []
+    if removed == added:
+        return
+    try:
+        pipe = get_redis().pipeline()
+        for key, field in removed:
+            pipe.hincrby(key, field, -1)
+        for key, field in added:
+            pipe.hincrby(key, field, 1)
+        await pipe.execute()
+    except Exception as e:
+        print(f"❌ Error updating directory facets: {e}")
+
+async def rebuild_directory_facets():
+    """Count every user once, used when the counters are missing"""
+    counts: Dict[str, Dict[str, int]] = {}
+    async for user in get_database().users.find({}, {facet: 1 for facet in FACETS}):
+        for key, field in _facet_fields(user):
+            counts.setdefault(key, {}).setdefault(field, 0)
+            counts[key][field] += 1
+
+    redis = get_redis()
+    old_keys = [key async for key in redis.scan_iter(match="directory:facets:*:*")]
+    pipe = redis.pipeline()
+    for key in old_keys + [_facet_hash(facet) for facet in FACETS]:
+        pipe.delete(key)
+    for key, fields in counts.items():
+        pipe.hset(key, mapping=fields)
+    pipe.set(FACETS_BUILT_KEY, "1")
+    await pipe.execute()
+
+async def ensure_directory_facets():
+    """Rebuild the counters if Redis lost them, one instance at a time"""
+    redis = get_redis()
+    if await redis.exists(FACETS_BUILT_KEY):
+        return
+    if not await redis.set(FACETS_LOCK_KEY, "1", nx=True, ex=60):
+        return
+    try:
+        await rebuild_directory_facets()
+        print("✅ Rebuilt directory facet counts")
+    finally:
+        await redis.delete(FACETS_LOCK_KEY)
+
+def _counts(raw: dict) -> Dict[str, int]:
+    return {value: int(count) for value, count in raw.items() if int(count) > 0}
+
+async def get_directory_facets(year: Optional[str], location: Optional[str]) -> Tuple[Dict[str, Dict[str, int]], int]:
+    """Facet counts under the other active filter, plus the number of matching users"""
+    try:
+        await ensure_directory_facets()
+        pipe = get_redis().pipeline()
+        pipe.hgetall(_facet_hash("Year", ("location", location)) if location is not None else _facet_hash("Year"))
+        pipe.hgetall(_facet_hash("location", ("Year", year)) if year is not None else _facet_hash("location"))
+        year_counts, location_counts = [_counts(raw) for raw in await pipe.execute()]
+    except Exception as e:
+        print(f"❌ Error reading directory facets: {e}")
+        return {facet: {} for facet in FACETS}, 0
+
+    if year is not None:
+        total = year_counts.get(year, 0)
+    else:
+        total = sum(year_counts.values())
+
+    # Users without a value are counted for totals but are not a facet option
+    year_counts.pop("", None)
+    location_counts.pop("", None)
+    return {"Year": year_counts, "location": location_counts}, total
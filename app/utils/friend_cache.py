@@ -0,0 +1,105 @@
+from typing import Dict, List
+from bson import ObjectId
+from app.core.config import settings
+from app.core.database import get_database
+from app.core.redis_client import get_redis
+
+def friend_set_key(user_id: str) -> str:
+    return f"friends:set:{user_id}"
+
+async def get_friend_ids(user_id: str) -> List[str]:
+    """Friend IDs of a user, from the Redis set or rebuilt from Mongo on a miss"""
+    key = friend_set_key(user_id)
+    try:
+        cached = await get_redis().smembers(key)
+        if cached:
+            return list(cached)
+    except Exception as e:
+        print(f"❌ Error reading friend set {key}: {e}")
+
+    user = None
+    if ObjectId.is_valid(user_id):
+        user = await get_database().users.find_one({"_id": ObjectId(user_id)}, {"friends": 1})
+    friend_ids = (user or {}).get("friends", [])
+
+    # Users without friends are cheap to re-read, an empty set cannot be stored anyway
+    if friend_ids:
+        try:
+            pipe = get_redis().pipeline()
+            pipe.sadd(key, *friend_ids)
+            pipe.expire(key, settings.FRIEND_SET_CACHE_TTL_SECONDS)
+            await pipe.execute()
+        except Exception as e:
+            print(f"❌ Error caching friend set {key}: {e}")
+    return friend_ids
+
+# Only touch sets that are cached, a partial set would read as the full friend list
+_UPDATE_CACHED_SETS = """
+for i, key in ipairs(KEYS) do
+    if redis.call('exists', key) == 1 then
+        redis.call(ARGV[1], key, ARGV[i + 1])
+    end
+end
+"""
+
+async def update_friend_sets(user_id: str, friend_id: str, added: bool):
+    """Mirror a friendship change into both cached sets, call after the Mongo write"""
+    keys = [friend_set_key(user_id), friend_set_key(friend_id)]
+    try:
+        script = get_redis().register_script(_UPDATE_CACHED_SETS)
+        await script(keys=keys, args=["sadd" if added else "srem", friend_id, user_id])
+    except Exception as e:
+        print(f"❌ Error updating friend sets {keys}: {e}")
+        await invalidate_friend_ids(user_id, friend_id)
+
+async def invalidate_friend_ids(*user_ids: str):
+    """Drop cached friend sets, call after the friends arrays changed in Mongo"""
+    if not user_ids:
+        return
+    try:
+        await get_redis().delete(*[friend_set_key(user_id) for user_id in user_ids])
+    except Exception as e:
+        print(f"❌ Error invalidating friend sets {user_ids}: {e}")
+
+async def load_friend_sets(user_ids: List[str]):
+    """Make sure the friend sets of all users are cached, one Mongo query for misses"""
+    redis = get_redis()
+    pipe = redis.pipeline()
+    for user_id in user_ids:
+        pipe.exists(friend_set_key(user_id))
+    cached = await pipe.execute()
+
+    missing = [ObjectId(user_id) for user_id, hit in zip(user_ids, cached) if not hit and ObjectId.is_valid(user_id)]
+    if not missing:
+        return
+    pipe = redis.pipeline()
+    async for user in get_database().users.find({"_id": {"$in": missing}}, {"friends": 1}):
+        if user.get("friends"):
+            key = friend_set_key(str(user["_id"]))
+            pipe.sadd(key, *user["friends"])
+            pipe.expire(key, settings.FRIEND_SET_CACHE_TTL_SECONDS)
+    await pipe.execute()
+
+async def count_mutual_friends(user_id: str, candidate_ids: List[str]) -> Dict[str, int]:
+    """Number of friends the user shares with each candidate"""
+    if not candidate_ids:
+        return {}
+    try:
+        await load_friend_sets([user_id, *candidate_ids])
+        pipe = get_redis().pipeline()
+        for candidate_id in candidate_ids:
+            pipe.sintercard(2, [friend_set_key(user_id), friend_set_key(candidate_id)])
+        counts = await pipe.execute()
+    except Exception as e:
+        print(f"❌ Error counting mutual friends for {user_id}: {e}")
+        return {candidate_id: 0 for candidate_id in candidate_ids}
+    return dict(zip(candidate_ids, counts))
+
+async def get_mutual_friend_ids(user_id: str, other_id: str) -> List[str]:
+    """IDs of the friends two users have in common"""
+    try:
+        await load_friend_sets([user_id, other_id])
+        return list(await get_redis().sinter([friend_set_key(user_id), friend_set_key(other_id)]))
+    except Exception as e:
+        print(f"❌ Error reading mutual friends of {user_id} and {other_id}: {e}")
+        return []
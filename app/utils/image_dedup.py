@@ -0,0 +1,83 @@
+import asyncio
+import hashlib
+import time
+from datetime import datetime
+from pymongo import ReturnDocument
+from app.core.config import settings
+from app.core.database import get_database
+from app.core.redis_client import get_redis
+from app.utils.s3_utils import (
+    PENDING_UPLOADS_KEY,
+    s3_client,
+    delete_file_from_s3,
+    get_key_from_url,
+)
+
+def _hash_object_sync(key: str):
+    obj = s3_client.get_object(Bucket=settings.AWS_S3_BUCKET_NAME, Key=key)
+    digest = hashlib.sha256()
+    for chunk in obj["Body"].iter_chunks(chunk_size=1024 * 1024):
+        digest.update(chunk)
+    return digest.hexdigest(), obj["ContentLength"], obj.get("ContentType", "")
+
+async def is_pending_upload(key: str) -> bool:
+    """Whether the key was issued by generate_presigned_url and not reaped yet"""
+    return await get_redis().zscore(PENDING_UPLOADS_KEY, key) is not None
+
+async def finalize_upload(key: str) -> str:
+    """Map an uploaded object to the canonical key for its content.
+
+    Only uploads still pending are hashed, and only those can be deleted as
+    duplicates. Objects uploaded before deduplication existed are referenced
+    by posts and profiles without an images record and are left alone.
+    """
+    db = get_database()
+    if await db.images.find_one({"key": key}, {"_id": 1}):
+        return key
+    if not await is_pending_upload(key):
+        return key
+
+    sha256, size, content_type = await asyncio.to_thread(_hash_object_sync, key)
+    image = await db.images.find_one_and_update(
+        {"_id": sha256},
+        {"$setOnInsert": {
+            "key": key,
+            "refCount": 0,
+            "size": size,
+            "contentType": content_type,
+            "createdAt": datetime.utcnow()
+        }},
+        upsert=True,
+        return_document=ReturnDocument.AFTER
+    )
+
+    canonical_key = image["key"]
+    if canonical_key != key:
+        # Same bytes already stored, drop the duplicate
+        await delete_file_from_s3(key)
+        redis = get_redis()
+        await redis.zrem(PENDING_UPLOADS_KEY, key)
+        # Give a not yet attached canonical upload a fresh grace period
+        await redis.zadd(PENDING_UPLOADS_KEY, {canonical_key: time.time()}, xx=True)
+        print(f"♻️ Deduplicated upload {key} -> {canonical_key}")
+
+    return canonical_key
+
+async def attach_image(url: str) -> str:
+    """Take a reference on an uploaded picture, returns the URL to store.
+
+    Hashing happens in POST /s3/finalize, which clients call right after the
+    PUT, so writes never download the object. An upload that was not
+    finalized is stored as is, its picturePath keeps the reaper off it.
+    """
+    key = get_key_from_url(url)
+    if not key:
+        return url
+
+    try:
+        # Referenced images are skipped by the upload reaper
+        await get_database().images.update_one({"key": key}, {"$inc": {"refCount": 1}})
+    except Exception as e:
+        # Keep the reference rather than failing the write
+        print(f"❌ Error attaching image {key}: {e}")
+    return url
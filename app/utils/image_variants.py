@@ -0,0 +1,151 @@
+import asyncio
+import io
+from typing import Dict, Optional
+from bson import ObjectId
+from PIL import Image, ImageOps
+from app.core.config import settings
+from app.core.database import get_database
+from app.core.etag import VersionKeys, bump_versions
+from app.utils.s3_utils import s3_client, get_key_from_url, get_public_url
+
+THUMBNAIL = "thumb"
+
+def _encode_webp(image: Image.Image) -> bytes:
+    buffer = io.BytesIO()
+    image.save(buffer, format="WEBP", quality=settings.IMAGE_WEBP_QUALITY, method=4)
+    return buffer.getvalue()
+
+def render_variants(data: bytes) -> Dict[str, bytes]:
+    """Render a square WebP thumbnail plus one WebP per configured width"""
+    with Image.open(io.BytesIO(data)) as source:
+        image = ImageOps.exif_transpose(source)
+        if image.mode not in ("RGB", "RGBA"):
+            image = image.convert("RGBA")
+
+        size = settings.IMAGE_THUMBNAIL_SIZE
+        variants = {
+            THUMBNAIL: _encode_webp(ImageOps.fit(image, (size, size), Image.Resampling.LANCZOS))
+        }
+
+        # Never upscale - clients fall back to the original for larger sizes
+        for width in sorted(settings.IMAGE_VARIANT_WIDTHS):
+            if width >= image.width:
+                break
+            height = max(1, round(image.height * width / image.width))
+            resized = image.resize((width, height), Image.Resampling.LANCZOS)
+            variants[f"w{width}"] = _encode_webp(resized)
+
+        return variants
+
+def _generate_variants_sync(key: str) -> Dict[str, str]:
+    obj = s3_client.get_object(Bucket=settings.AWS_S3_BUCKET_NAME, Key=key)
+    rendered = render_variants(obj["Body"].read())
+
+    stem = key.rsplit(".", 1)[0]
+    variants = {}
+    for name, body in rendered.items():
+        variant_key = f"variants/{stem}/{name}.webp"
+        s3_client.put_object(
+            Bucket=settings.AWS_S3_BUCKET_NAME,
+            Key=variant_key,
+            Body=body,
+            ContentType="image/webp",
+            CacheControl="public, max-age=31536000, immutable"
+        )
+        variants[name] = variant_key
+    return variants
+
+async def generate_image_variants(key: str) -> Dict[str, str]:
+    """Generate and upload variants for an object, returns variant name -> key"""
+    # Pillow and boto3 are blocking, keep them off the event loop
+    return await asyncio.to_thread(_generate_variants_sync, key)
+
+async def get_or_generate_variants(key: str) -> Dict[str, str]:
+    """Variants for a canonical image, rendered once per distinct content"""
+    db = get_database()
+    image = await db.images.find_one({"key": key}, {"variants": 1})
+    if image and image.get("variants"):
+        return image["variants"]
+
+    variants = await generate_image_variants(key)
+    await db.images.update_one({"key": key}, {"$set": {"variants": variants}})
+    return variants
+
+async def process_post_image(post_id: str, picture_path: str):
+    """Background task: generate variants for a post picture"""
+    key = get_key_from_url(picture_path)
+    if not key or not settings.IMAGE_VARIANTS_ENABLED:
+        return
+
+    try:
+        variants = await get_or_generate_variants(key)
+        db = get_database()
+        await db.posts.update_one(
+            {"_id": ObjectId(post_id)},
+            {"$set": {"pictureVariants": variants}}
+        )
+        await bump_versions(VersionKeys.POSTS)
+        print(f"🖼️ Generated {len(variants)} image variants for post {post_id}")
+    except Exception as e:
+        print(f"❌ Error generating image variants for post {post_id}: {e}")
+
+async def process_profile_image(user_id: str, picture_path: str):
+    """Background task: generate variants for a profile picture"""
+    key = get_key_from_url(picture_path)
+    if not key or not settings.IMAGE_VARIANTS_ENABLED:
+        return
+
+    try:
+        variants = await get_or_generate_variants(key)
+        db = get_database()
+        user = await db.users.find_one_and_update(
+            {"_id": ObjectId(user_id)},
+            {"$set": {"pictureVariants": variants}},
+            {"friends": 1}
+        )
+        # Posts denormalize the author's picture
+        await db.posts.update_many(
+            {"userId": user_id, "userPicturePath": picture_path},
+            {"$set": {"userPictureVariants": variants}}
+        )
+        friends = user.get("friends", []) if user else []
+        await bump_versions(
+            VersionKeys.POSTS, VersionKeys.user(user_id),
+            *[VersionKeys.friends(f) for f in friends]
+        )
+        print(f"🖼️ Generated {len(variants)} image variants for user {user_id}")
+    except Exception as e:
+        print(f"❌ Error generating image variants for user {user_id}: {e}")
+
+def select_variant_url(original: str, variants: Optional[Dict[str, str]], width: Optional[int]) -> str:
+    """Smallest variant URL at least `width` pixels wide, else the original"""
+    if not width or not variants:
+        return original
+
+    if width <= settings.IMAGE_THUMBNAIL_SIZE and THUMBNAIL in variants:
+        return get_public_url(variants[THUMBNAIL])
+
+    widths = sorted(int(name[1:]) for name in variants if name.startswith("w"))
+    for candidate in widths:
+        if candidate >= width:
+            return get_public_url(variants[f"w{candidate}"])
+    return original
+
+def apply_image_size(doc: dict, width: Optional[int]) -> dict:
+    """Copy of a post/user document with picture URLs pointing at size-appropriate variants.
+
+    The input is left untouched, documents may be shared between coalesced requests.
+    """
+    if not width:
+        return doc
+
+    doc = dict(doc)
+    doc["picturePath"] = select_variant_url(
+        doc.get("picturePath", ""), doc.get("pictureVariants"), width
+    )
+    if "userPicturePath" in doc:
+        # Author avatars in the feed are always rendered small
+        doc["userPicturePath"] = select_variant_url(
+            doc["userPicturePath"], doc.get("userPictureVariants"), settings.IMAGE_THUMBNAIL_SIZE
+        )
+    return doc
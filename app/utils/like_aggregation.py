@@ -0,0 +1,138 @@
+import asyncio
+import json
+import time
+from typing import List, Optional
+from app.core.config import settings
+from app.core.redis_client import get_redis, NotificationChannels
+from app.core.outbox import outbox_event, enqueue_events
+
+# Windows that are due, member "{postId}:{ownerId}" scored by when the window closes (ms)
+LIKE_WINDOWS_DUE_KEY = "likes:pending:due"
+# Windows emitted per round trip by the flusher
+FLUSH_BATCH_SIZE = 100
+
+def pending_like_keys(post_id: str, owner_id: str) -> List[str]:
+    """Window hash (count, since, actor:{id} details), pending actor set, recent actor list"""
+    prefix = f"likes:pending:{post_id}:{owner_id}"
+    return [prefix, f"{prefix}:actors", f"{prefix}:recent"]
+
+# The first like opens the window, an actor already pending in it is not counted twice
+_RECORD_LIKE = """
+if redis.call('sadd', KEYS[2], ARGV[1]) == 0 then
+    return 0
+end
+redis.call('hincrby', KEYS[1], 'count', 1)
+redis.call('hsetnx', KEYS[1], 'since', ARGV[3])
+redis.call('hset', KEYS[1], 'actor:' .. ARGV[1], ARGV[2])
+redis.call('lrem', KEYS[3], 0, ARGV[1])
+redis.call('lpush', KEYS[3], ARGV[1])
+redis.call('ltrim', KEYS[3], 0, tonumber(ARGV[6]) - 1)
+redis.call('zadd', KEYS[4], 'NX', tonumber(ARGV[3]) + tonumber(ARGV[4]), ARGV[5])
+for i = 1, 3 do
+    redis.call('expire', KEYS[i], ARGV[7])
+end
+return 1
+"""
+
+# Only a like still pending in this window is cancelled, older ones were already sent
+_CANCEL_LIKE = """
+if redis.call('srem', KEYS[2], ARGV[1]) == 0 then
+    return 0
+end
+redis.call('hincrby', KEYS[1], 'count', -1)
+redis.call('hdel', KEYS[1], 'actor:' .. ARGV[1])
+redis.call('lrem', KEYS[3], 0, ARGV[1])
+return 1
+"""
+
+# Read and clear a window in one step so only one instance emits it
+_TAKE_WINDOW = """
+local window = redis.call('hgetall', KEYS[1])
+local recent = redis.call('lrange', KEYS[3], 0, -1)
+if #recent == 0 then
+    -- The recent likers all unliked, name any other pending one instead
+    recent = redis.call('srandmember', KEYS[2], tonumber(ARGV[2]))
+end
+redis.call('del', KEYS[1], KEYS[2], KEYS[3])
+redis.call('zrem', KEYS[4], ARGV[1])
+return {window, recent}
+"""
+
+async def record_like(post_id: str, owner_id: str, actor: dict) -> bool:
+    """Add a like to the post's open window, False if it could not be recorded"""
+    try:
+        script = get_redis().register_script(_RECORD_LIKE)
+        await script(
+            keys=pending_like_keys(post_id, owner_id) + [LIKE_WINDOWS_DUE_KEY],
+            args=[
+                actor["actorId"], json.dumps(actor), int(time.time() * 1000),
+                settings.LIKE_AGGREGATION_WINDOW_SECONDS * 1000, f"{post_id}:{owner_id}",
+                settings.LIKE_AGGREGATION_RECENT_ACTORS,
+                # Outlives the window by far, in case the flusher is down
+                settings.LIKE_AGGREGATION_WINDOW_SECONDS * 10 + 60,
+            ],
+        )
+        return True
+    except Exception as e:
+        print(f"❌ Error aggregating like on post {post_id}: {e}")
+        return False
+
+async def cancel_like(post_id: str, owner_id: str, actor_id: str):
+    try:
+        script = get_redis().register_script(_CANCEL_LIKE)
+        await script(keys=pending_like_keys(post_id, owner_id), args=[actor_id])
+    except Exception as e:
+        print(f"❌ Error cancelling like on post {post_id}: {e}")
+
+async def _take_window(post_id: str, owner_id: str) -> Optional[dict]:
+    """Aggregated LIKE event for a closed window, None if every like was taken back"""
+    script = get_redis().register_script(_TAKE_WINDOW)
+    fields, recent = await script(
+        keys=pending_like_keys(post_id, owner_id) + [LIKE_WINDOWS_DUE_KEY],
+        args=[f"{post_id}:{owner_id}", settings.LIKE_AGGREGATION_RECENT_ACTORS],
+    )
+    window = dict(zip(fields[::2], fields[1::2]))
+    count = int(window.get("count", 0))
+    actors = [json.loads(window[f"actor:{actor_id}"]) for actor_id in recent if f"actor:{actor_id}" in window]
+    if count <= 0 or not actors:
+        return None
+
+    latest = actors[0]
+    return outbox_event(
+        NotificationChannels.LIKE,
+        {
+            "userId": owner_id,
+            "actorId": latest["actorId"],
+            "actorName": latest["actorName"],
+            "actorPicture": latest["actorPicture"],
+            "relatedId": post_id,
+            "metadata": {
+                "likeCount": count,
+                "recentActors": actors,
+            }
+        },
+        event_id=f"like:{post_id}:{owner_id}:{window['since']}"
+    )
+
+async def flush_like_windows() -> int:
+    """Emit one event per closed window, returns how many windows were taken"""
+    now = int(time.time() * 1000)
+    due = await get_redis().zrangebyscore(LIKE_WINDOWS_DUE_KEY, "-inf", now, start=0, num=FLUSH_BATCH_SIZE)
+    events = []
+    for member in due:
+        post_id, owner_id = member.split(":", 1)
+        event = await _take_window(post_id, owner_id)
+        if event:
+            events.append(event)
+    await enqueue_events(events)
+    return len(due)
+
+async def run_like_aggregation():
+    """Background loop started from the app lifespan"""
+    while True:
+        await asyncio.sleep(settings.LIKE_AGGREGATION_FLUSH_INTERVAL_SECONDS)
+        try:
+            while await flush_like_windows() == FLUSH_BATCH_SIZE:
+                pass
+        except Exception as e:
+            print(f"❌ Error flushing like windows: {e}")
@@ -0,0 +1,159 @@
+from collections import Counter
+from typing import Dict, Iterable, List
+from bson import ObjectId
+from app.core.config import settings
+from app.core.database import get_database
+from app.core.redis_client import get_redis
+
+# Score = mutual friends * weight + bonuses for sharing a graduation year or location
+MUTUAL_FRIEND_WEIGHT = 1.0
+SAME_YEAR_WEIGHT = 2.0
+SAME_LOCATION_WEIGHT = 1.0
+
+# Users sharing the Year that are considered when a set is built from scratch
+SAME_YEAR_CANDIDATES = 200
+
+_PROFILE_FIELDS = {"friends": 1, "Year": 1, "location": 1}
+
+def recommendations_key(user_id: str) -> str:
+    return f"recommend:{user_id}"
+
+def empty_recommendations_key(user_id: str) -> str:
+    """Set when a build found nobody, Redis does not keep empty sorted sets"""
+    return f"recommend:{user_id}:empty"
+
+def _same(a: dict, b: dict, field: str) -> bool:
+    value = (a.get(field) or "").strip().lower()
+    return bool(value) and value == (b.get(field) or "").strip().lower()
+
+def profile_bonus(user: dict, candidate: dict) -> float:
+    bonus = 0.0
+    if _same(user, candidate, "Year"):
+        bonus += SAME_YEAR_WEIGHT
+    if _same(user, candidate, "location"):
+        bonus += SAME_LOCATION_WEIGHT
+    return bonus
+
+async def _load_profiles(user_ids: Iterable[str]) -> Dict[str, dict]:
+    ids = [ObjectId(user_id) for user_id in set(user_ids) if ObjectId.is_valid(user_id)]
+    if not ids:
+        return {}
+    profiles = {}
+    async for doc in get_database().users.find({"_id": {"$in": ids}}, _PROFILE_FIELDS):
+        profiles[str(doc["_id"])] = doc
+    return profiles
+
+async def build_recommendations(user_id: str) -> bool:
+    """Score every candidate from scratch (two hops), False if there is nobody to suggest"""
+    user = await get_database().users.find_one({"_id": ObjectId(user_id)}, _PROFILE_FIELDS)
+    if not user:
+        return False
+    friends = set(user.get("friends", []))
+
+    mutual_counts = Counter()
+    for friend in (await _load_profiles(friends)).values():
+        mutual_counts.update(f for f in friend.get("friends", []) if f != user_id and f not in friends)
+
+    candidates = await _load_profiles(mutual_counts)
+    if user.get("Year"):
+        cursor = get_database().users.find({"Year": user["Year"]}, _PROFILE_FIELDS).limit(SAME_YEAR_CANDIDATES)
+        async for doc in cursor:
+            candidates.setdefault(str(doc["_id"]), doc)
+
+    scores = {}
+    for candidate_id, candidate in candidates.items():
+        if candidate_id == user_id or candidate_id in friends:
+            continue
+        score = mutual_counts[candidate_id] * MUTUAL_FRIEND_WEIGHT + profile_bonus(user, candidate)
+        if score > 0:
+            scores[candidate_id] = score
+    if not scores:
+        # Remember the empty result so every read does not rebuild from scratch
+        await get_redis().set(empty_recommendations_key(user_id), "1", ex=settings.RECOMMENDATION_EMPTY_TTL_SECONDS)
+        return False
+
+    # Rebuilt from scratch once the TTL runs out, which also undoes drift from capping
+    key = recommendations_key(user_id)
+    pipe = get_redis().pipeline()
+    pipe.delete(key)
+    pipe.zadd(key, scores)
+    pipe.zremrangebyrank(key, 0, -settings.RECOMMENDATION_LIMIT - 1)
+    pipe.expire(key, settings.RECOMMENDATION_TTL_SECONDS)
+    await pipe.execute()
+    return True
+
+async def get_recommendations(user_id: str, limit: int) -> List[str]:
+    """Top candidate IDs, best first"""
+    key = recommendations_key(user_id)
+    redis = get_redis()
+    recommended = await redis.zrevrange(key, 0, limit - 1)
+    if not recommended and not await redis.exists(key, empty_recommendations_key(user_id)):
+        if await build_recommendations(user_id):
+            recommended = await redis.zrevrange(key, 0, limit - 1)
+    return recommended
+
+# Adjust scores only in sets that were built, a missing set is built on its next read.
+# KEYS: recommendation sets, ARGV: cap, delta, then member and bonus per key
+_ADJUST_SCORES = """
+local cap = tonumber(ARGV[1])
+local delta = tonumber(ARGV[2])
+for i, key in ipairs(KEYS) do
+    if redis.call('exists', key) == 1 then
+        local member = ARGV[2 * i + 1]
+        redis.call('zadd', key, 'NX', ARGV[2 * i + 2], member)
+        if tonumber(redis.call('zincrby', key, delta, member)) <= 0 then
+            redis.call('zrem', key, member)
+        end
+        redis.call('zremrangebyrank', key, 0, -cap - 1)
+    end
+end
+"""
+
+async def update_recommendations(user: dict, friend: dict, added: bool):
+    """Apply one friendship change to every affected set.
+
+    Expects both user documents with their friends lists after the change.
+    Adding u-v makes u and each friend of v one mutual friend closer (and v
+    and each friend of u), removing the edge undoes it.
+    """
+    user_id, friend_id = str(user["_id"]), str(friend["_id"])
+    user_friends = set(user.get("friends", [])) - {friend_id}
+    friend_friends = set(friend.get("friends", [])) - {user_id}
+
+    try:
+        profiles = await _load_profiles(user_friends | friend_friends)
+        keys, args = [], []
+        for person, person_id, friends_of_other, own_friends in (
+            (user, user_id, friend_friends, user_friends),
+            (friend, friend_id, user_friends, friend_friends),
+        ):
+            for other_id in friends_of_other - own_friends:
+                other = profiles.get(other_id)
+                if other is None:
+                    continue
+                bonus = profile_bonus(person, other)
+                keys += [recommendations_key(person_id), recommendations_key(other_id)]
+                args += [other_id, bonus, person_id, bonus]
+
+        redis = get_redis()
+        if keys:
+            delta = MUTUAL_FRIEND_WEIGHT if added else -MUTUAL_FRIEND_WEIGHT
+            script = redis.register_script(_ADJUST_SCORES)
+            await script(keys=keys, args=[settings.RECOMMENDATION_LIMIT, delta, *args])
+
+        # Either side may have had nobody to suggest, build again on the next read
+        await redis.delete(empty_recommendations_key(user_id), empty_recommendations_key(friend_id))
+        if added:
+            await redis.zrem(recommendations_key(user_id), friend_id)
+            await redis.zrem(recommendations_key(friend_id), user_id)
+        else:
+            # Former friends become candidates for each other again
+            score = len(user_friends & friend_friends) * MUTUAL_FRIEND_WEIGHT + profile_bonus(user, friend)
+            if score > 0:
+                script = redis.register_script(_ADJUST_SCORES)
+                await script(
+                    keys=[recommendations_key(user_id), recommendations_key(friend_id)],
+                    args=[settings.RECOMMENDATION_LIMIT, 0, friend_id, score, user_id, score],
+                )
+    except Exception as e:
+        print(f"❌ Error updating recommendations for {user_id} and {friend_id}: {e}")
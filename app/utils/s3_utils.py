@@ -1,8 +1,18 @@
 import boto3
 from botocore.config import Config
 from app.core.config import settings
+from app.core.redis_client import get_redis
+import asyncio
 import secrets
+import time
 from datetime import datetime
+from typing import List, Optional
+
+# Sorted set of issued upload keys scored by issue time, drained by the upload reaper
+PENDING_UPLOADS_KEY = "uploads:pending"
+
+# DeleteObjects accepts at most 1000 keys per request
+S3_DELETE_BATCH_SIZE = 1000
 
 # Configure S3 client
 s3_client = boto3.client(
@@ -10,9 +20,29 @@ s3_client = boto3.client(
     region_name=settings.AWS_REGION,
     aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
     aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
+    endpoint_url=settings.AWS_S3_ENDPOINT_URL,
     config=Config(signature_version='s3v4')
 )
 
+def get_public_base_url() -> str:
+    """Base URL uploaded objects are served from"""
+    if settings.AWS_S3_PUBLIC_URL:
+        return settings.AWS_S3_PUBLIC_URL.rstrip('/')
+    if settings.AWS_S3_ENDPOINT_URL:
+        return f"{settings.AWS_S3_ENDPOINT_URL.rstrip('/')}/{settings.AWS_S3_BUCKET_NAME}"
+    return f"https://{settings.AWS_S3_BUCKET_NAME}.s3.{settings.AWS_REGION}.amazonaws.com"
+
+def get_public_url(key: str) -> str:
+    """Public access URL for an object key"""
+    return f"{get_public_base_url()}/{key}"
+
+def get_key_from_url(url: str) -> Optional[str]:
+    """Object key for one of our access URLs, None for external URLs"""
+    base = get_public_base_url() + "/"
+    if not url or not url.startswith(base):
+        return None
+    return url[len(base):] or None
+
 def generate_file_name(file_type: str) -> str:
     """Generate unique file name"""
     timestamp = int(datetime.now().timestamp() * 1000)
@@ -38,7 +68,9 @@ async def generate_presigned_url(file_type: str, folder: str = "uploads"):
         )
         
         # Generate public access URL
-        access_url = f"https://{settings.AWS_S3_BUCKET_NAME}.s3.{settings.AWS_REGION}.amazonaws.com/{key}"
+        access_url = get_public_url(key)
+        
+        await track_upload(key)
         
         return {
             "uploadUrl": upload_url,
@@ -49,10 +81,19 @@ async def generate_presigned_url(file_type: str, folder: str = "uploads"):
         print(f"Error generating presigned URL: {e}")
         raise
 
+async def track_upload(key: str):
+    """Remember an issued upload key so it can be reaped if never attached"""
+    try:
+        await get_redis().zadd(PENDING_UPLOADS_KEY, {key: time.time()})
+    except Exception as e:
+        # Tracking is best effort, never fail the upload because of it
+        print(f"Error tracking upload {key}: {e}")
+
 async def delete_file_from_s3(key: str):
     """Delete file from S3"""
     try:
-        s3_client.delete_object(
+        await asyncio.to_thread(
+            s3_client.delete_object,
             Bucket=settings.AWS_S3_BUCKET_NAME,
             Key=key
         )
@@ -61,3 +102,29 @@ async def delete_file_from_s3(key: str):
     except Exception as e:
         print(f"Error deleting file from S3: {e}")
         raise
+
+def _delete_files_sync(keys: List[str]) -> List[str]:
+    failed = []
+    for i in range(0, len(keys), S3_DELETE_BATCH_SIZE):
+        batch = keys[i:i + S3_DELETE_BATCH_SIZE]
+        response = s3_client.delete_objects(
+            Bucket=settings.AWS_S3_BUCKET_NAME,
+            Delete={
+                "Objects": [{"Key": key} for key in batch],
+                "Quiet": True
+            }
+        )
+        failed.extend(error["Key"] for error in response.get("Errors", []))
+    return failed
+
+async def delete_files_from_s3(keys: List[str]) -> List[str]:
+    """Delete files with batched DeleteObjects calls, returns keys that failed"""
+    if not keys:
+        return []
+    try:
+        failed = await asyncio.to_thread(_delete_files_sync, keys)
+        print(f"Deleted {len(keys) - len(failed)} files from S3")
+        return failed
+    except Exception as e:
+        print(f"Error deleting files from S3: {e}")
+        raise
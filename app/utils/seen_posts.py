@@ -0,0 +1,89 @@
+import hashlib
+import math
+from typing import List, Set
+from app.core.config import settings
+from app.core.redis_client import get_redis
+
+# Each user has two Bloom filter generations stored as plain Redis bitmaps.
+# Posts are added to the current one, membership checks both, and once the
+# current generation holds SEEN_POSTS_CAPACITY posts the older one is dropped.
+# Memory stays at two filters per user while the false positive rate stays
+# at the configured level, since neither filter ever holds more than capacity.
+
+def _filter_size() -> tuple:
+    """Bits per filter and hash functions for the configured capacity and error rate"""
+    n, p = settings.SEEN_POSTS_CAPACITY, settings.SEEN_POSTS_FALSE_POSITIVE_RATE
+    bits = math.ceil(-n * math.log(p) / math.log(2) ** 2)
+    hashes = max(1, round(bits / n * math.log(2)))
+    return bits, hashes
+
+BITS, HASHES = _filter_size()
+
+def _meta_key(user_id: str) -> str:
+    return f"seen:{user_id}"
+
+def _filter_key(user_id: str, generation: int) -> str:
+    return f"seen:{user_id}:{generation}"
+
+def _offsets(post_id: str) -> List[int]:
+    # Double hashing, k positions from one digest
+    digest = hashlib.blake2b(post_id.encode(), digest_size=16).digest()
+    h1, h2 = int.from_bytes(digest[:8], "big"), int.from_bytes(digest[8:], "big") | 1
+    return [(h1 + i * h2) % BITS for i in range(HASHES)]
+
+async def _generation(user_id: str) -> int:
+    return int(await get_redis().hget(_meta_key(user_id), "generation") or 0)
+
+async def filter_seen(user_id: str, post_ids: List[str]) -> Set[str]:
+    """Post IDs the user has (probably) been served already"""
+    if not post_ids:
+        return set()
+    try:
+        generation = await _generation(user_id)
+        pipe = get_redis().pipeline()
+        for key in (_filter_key(user_id, generation), _filter_key(user_id, generation - 1)):
+            bits = pipe.bitfield(key)
+            for post_id in post_ids:
+                for offset in _offsets(post_id):
+                    bits.get("u1", offset)
+            bits.execute()
+        current, previous = await pipe.execute()
+    except Exception as e:
+        print(f"❌ Error reading seen posts of {user_id}: {e}")
+        return set()
+
+    seen = set()
+    for i, post_id in enumerate(post_ids):
+        window = slice(i * HASHES, (i + 1) * HASHES)
+        if all(current[window]) or all(previous[window]):
+            seen.add(post_id)
+    return seen
+
+async def mark_seen(user_id: str, post_ids: List[str]):
+    """Record posts as served, rotating to a fresh filter when the current one is full"""
+    if not post_ids:
+        return
+    meta_key = _meta_key(user_id)
+    try:
+        redis = get_redis()
+        generation = await _generation(user_id)
+        key = _filter_key(user_id, generation)
+
+        pipe = redis.pipeline()
+        bits = pipe.bitfield(key)
+        for post_id in post_ids:
+            for offset in _offsets(post_id):
+                bits.set("u1", offset, 1)
+        bits.execute()
+        pipe.expire(key, settings.SEEN_POSTS_TTL_SECONDS)
+        pipe.hincrby(meta_key, "count", len(post_ids))
+        pipe.expire(meta_key, settings.SEEN_POSTS_TTL_SECONDS)
+        count = (await pipe.execute())[-2]
+
+        if count >= settings.SEEN_POSTS_CAPACITY:
+            pipe = redis.pipeline()
+            pipe.hset(meta_key, mapping={"generation": generation + 1, "count": 0})
+            pipe.delete(_filter_key(user_id, generation - 1))
+            await pipe.execute()
+    except Exception as e:
+        print(f"❌ Error marking posts seen for {user_id}: {e}")
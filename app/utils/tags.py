@@ -0,0 +1,77 @@
+import re
+import time
+from typing import List, Tuple
+from app.core.config import settings
+from app.core.redis_client import get_redis
+
+HASHTAG_PATTERN = re.compile(r"(?<![\w#])#(\w{1,50})")
+MENTION_PATTERN = re.compile(r"(?<![\w@])@(\w{1,50})")
+
+# Tags kept per post, anything beyond is almost certainly spam
+MAX_TAGS_PER_POST = 20
+
+# Sliding windows trending tags can be asked for, in seconds
+TRENDING_WINDOWS = {"1h": 60 * 60, "24h": 60 * 60 * 24, "7d": 60 * 60 * 24 * 7}
+
+def _extract(pattern: re.Pattern, text: str) -> List[str]:
+    found = dict.fromkeys(match.lower() for match in pattern.findall(text or ""))
+    return list(found)[:MAX_TAGS_PER_POST]
+
+def extract_hashtags(text: str) -> List[str]:
+    return _extract(HASHTAG_PATTERN, text)
+
+def extract_mentions(text: str) -> List[str]:
+    return _extract(MENTION_PATTERN, text)
+
+def tag_timeline_key(tag: str) -> str:
+    return f"tag:{tag}:posts"
+
+def _bucket_key(bucket: int) -> str:
+    return f"tags:trending:{bucket}"
+
+def _current_bucket() -> int:
+    return int(time.time()) // settings.TRENDING_BUCKET_SECONDS
+
+async def index_post_tags(post_id: str, tags: List[str], created_at_ms: int):
+    """Add a new post to its tags' recency sets and the current trending bucket"""
+    if not tags:
+        return
+    bucket_key = _bucket_key(_current_bucket())
+    try:
+        pipe = get_redis().pipeline()
+        for tag in tags:
+            key = tag_timeline_key(tag)
+            pipe.zadd(key, {post_id: created_at_ms})
+            pipe.zremrangebyrank(key, 0, -settings.TAG_TIMELINE_LIMIT - 1)
+            pipe.zincrby(bucket_key, 1, tag)
+        pipe.expire(bucket_key, max(TRENDING_WINDOWS.values()) + settings.TRENDING_BUCKET_SECONDS)
+        await pipe.execute()
+    except Exception as e:
+        print(f"❌ Error indexing tags for post {post_id}: {e}")
+
+async def get_recent_tag_posts(tag: str, limit: int) -> List[str]:
+    """Newest post IDs for a tag, empty if the recency set is gone"""
+    try:
+        return await get_redis().zrevrange(tag_timeline_key(tag), 0, limit - 1)
+    except Exception as e:
+        print(f"❌ Error reading tag timeline {tag}: {e}")
+        return []
+
+async def get_trending_tags(window: str, limit: int) -> List[Tuple[str, int]]:
+    """Most used tags over the window, summed from per-bucket counters"""
+    current = _current_bucket()
+    buckets = TRENDING_WINDOWS[window] // settings.TRENDING_BUCKET_SECONDS
+    # The union only changes when a bucket rolls over or a post is tagged, cache it per bucket
+    union_key = f"tags:trending:{window}:{current}"
+    try:
+        redis = get_redis()
+        if not await redis.exists(union_key):
+            pipe = redis.pipeline()
+            pipe.zunionstore(union_key, [_bucket_key(bucket) for bucket in range(current - buckets + 1, current + 1)])
+            pipe.expire(union_key, settings.TRENDING_CACHE_SECONDS)
+            await pipe.execute()
+        trending = await redis.zrevrange(union_key, 0, limit - 1, withscores=True)
+    except Exception as e:
+        print(f"❌ Error reading trending tags for {window}: {e}")
+        return []
+    return [(tag, int(count)) for tag, count in trending]
@@ -0,0 +1,126 @@
+import asyncio
+import time
+from typing import List
+from app.core.config import settings
+from app.core.redis_client import get_redis
+
+TRENDING_POSTS_KEY = "trending:posts"
+# Scores are stored relative to this time so old ones never have to be touched
+TRENDING_EPOCH_KEY = "trending:epoch"
+
+def trending_likes_key(post_id: str) -> str:
+    """Hash of liker ID -> when the like was scored"""
+    return f"trending:likes:{post_id}"
+
+# Engagement weights, comments and views count once endpoints record them
+POST_WEIGHT = 1.0
+LIKE_WEIGHT = 1.0
+COMMENT_WEIGHT = 2.0
+VIEW_WEIGHT = 0.1
+
+# Posts whose decayed score drops below this fall out of the set
+MIN_SCORE = 0.05
+
+# Forward decay: weight * 2^((now - epoch) / half life) ranks exactly like
+# weight * 2^((now - event) / half life), without rescoring older events
+_RECORD = """
+redis.call('set', KEYS[2], ARGV[3], 'NX')
+local epoch = tonumber(redis.call('get', KEYS[2]))
+local boost = tonumber(ARGV[2]) * 2 ^ ((tonumber(ARGV[3]) - epoch) / tonumber(ARGV[4]))
+if tonumber(redis.call('zincrby', KEYS[1], boost, ARGV[1])) <= 0 then
+    redis.call('zrem', KEYS[1], ARGV[1])
+end
+"""
+
+# An unlike takes back the boost its like was scored with, not a boost at
+# the time of the unlike, which would outweigh every older event on the post
+_RECORD_LIKE = """
+redis.call('set', KEYS[2], ARGV[3], 'NX')
+local epoch = tonumber(redis.call('get', KEYS[2]))
+local liked_at = tonumber(ARGV[3])
+local weight = tonumber(ARGV[2])
+if weight < 0 then
+    liked_at = tonumber(redis.call('hget', KEYS[3], ARGV[5]))
+    if not liked_at then
+        return 0
+    end
+    redis.call('hdel', KEYS[3], ARGV[5])
+else
+    redis.call('hset', KEYS[3], ARGV[5], ARGV[3])
+    redis.call('expire', KEYS[3], ARGV[6])
+end
+local boost = weight * 2 ^ ((liked_at - epoch) / tonumber(ARGV[4]))
+if tonumber(redis.call('zincrby', KEYS[1], boost, ARGV[1])) <= 0 then
+    redis.call('zrem', KEYS[1], ARGV[1])
+end
+return 1
+"""
+
+# Move the epoch to now, dividing every score by the boost that built up since
+_REBASE = """
+local epoch = tonumber(redis.call('get', KEYS[2]))
+if not epoch then
+    return 0
+end
+local factor = 2 ^ ((tonumber(ARGV[1]) - epoch) / tonumber(ARGV[2]))
+local entries = redis.call('zrange', KEYS[1], 0, -1, 'WITHSCORES')
+for i = 1, #entries, 2 do
+    redis.call('zadd', KEYS[1], tonumber(entries[i + 1]) / factor, entries[i])
+end
+redis.call('set', KEYS[2], ARGV[1])
+redis.call('zremrangebyscore', KEYS[1], '-inf', '(' .. ARGV[3])
+redis.call('zremrangebyrank', KEYS[1], 0, -tonumber(ARGV[4]) - 1)
+return #entries / 2
+"""
+
+async def record_engagement(post_id: str, weight: float):
+    """Add (or with a negative weight, take back) engagement on a post"""
+    try:
+        script = get_redis().register_script(_RECORD)
+        await script(
+            keys=[TRENDING_POSTS_KEY, TRENDING_EPOCH_KEY],
+            args=[post_id, weight, time.time(), settings.TRENDING_HALF_LIFE_SECONDS],
+        )
+    except Exception as e:
+        print(f"❌ Error recording engagement for post {post_id}: {e}")
+
+async def record_like_engagement(post_id: str, user_id: str, liked: bool):
+    """Score a like, or take back exactly what the user's like added"""
+    try:
+        script = get_redis().register_script(_RECORD_LIKE)
+        await script(
+            keys=[TRENDING_POSTS_KEY, TRENDING_EPOCH_KEY, trending_likes_key(post_id)],
+            args=[
+                post_id, LIKE_WEIGHT if liked else -LIKE_WEIGHT, time.time(),
+                settings.TRENDING_HALF_LIFE_SECONDS, user_id,
+                # Ten half lives on, a like adds under 0.1% of its weight
+                settings.TRENDING_HALF_LIFE_SECONDS * 10,
+            ],
+        )
+    except Exception as e:
+        print(f"❌ Error recording like for post {post_id}: {e}")
+
+async def get_trending_post_ids(limit: int) -> List[str]:
+    """Top post IDs by decayed score"""
+    try:
+        return await get_redis().zrevrange(TRENDING_POSTS_KEY, 0, limit - 1)
+    except Exception as e:
+        print(f"❌ Error reading trending posts: {e}")
+        return []
+
+async def decay_trending_posts() -> int:
+    """Re-decay every score in bulk, prune faded posts and cap the set"""
+    script = get_redis().register_script(_REBASE)
+    return await script(
+        keys=[TRENDING_POSTS_KEY, TRENDING_EPOCH_KEY],
+        args=[time.time(), settings.TRENDING_HALF_LIFE_SECONDS, MIN_SCORE, settings.TRENDING_POSTS_LIMIT],
+    )
+
+async def run_trending_decay():
+    """Background loop started from the app lifespan"""
+    while True:
+        await asyncio.sleep(settings.TRENDING_DECAY_INTERVAL_SECONDS)
+        try:
+            await decay_trending_posts()
+        except Exception as e:
+            print(f"❌ Error decaying trending posts: {e}")
@@ -0,0 +1,80 @@
+import asyncio
+import time
+from typing import List, Set
+from app.core.config import settings
+from app.core.database import get_database
+from app.core.redis_client import get_redis
+from app.utils.s3_utils import (
+    PENDING_UPLOADS_KEY,
+    S3_DELETE_BATCH_SIZE,
+    delete_files_from_s3,
+    get_public_url,
+)
+
+REAPER_LOCK_KEY = "uploads:reaper:lock"
+
+async def find_referenced_keys(keys: List[str]) -> Set[str]:
+    """Keys attached to a post or profile, by reference count or picture URL"""
+    db = get_database()
+    referenced = set()
+    async for image in db.images.find({"key": {"$in": keys}, "refCount": {"$gt": 0}}, {"key": 1}):
+        referenced.add(image["key"])
+
+    urls = {get_public_url(key): key for key in keys}
+    query = {"picturePath": {"$in": list(urls)}}
+    for collection in (db.posts, db.users):
+        async for doc in collection.find(query, {"picturePath": 1}):
+            referenced.add(urls[doc["picturePath"]])
+    return referenced
+
+async def reap_orphaned_uploads() -> int:
+    """Delete issued uploads that were never attached within the grace period"""
+    redis = get_redis()
+
+    # Only one instance reaps at a time
+    if not await redis.set(REAPER_LOCK_KEY, "1", nx=True, ex=settings.UPLOAD_REAPER_INTERVAL_SECONDS):
+        return 0
+
+    reaped = 0
+    try:
+        while True:
+            cutoff = time.time() - settings.UPLOAD_GRACE_PERIOD_SECONDS
+            keys = await redis.zrangebyscore(
+                PENDING_UPLOADS_KEY, "-inf", cutoff, start=0, num=S3_DELETE_BATCH_SIZE
+            )
+            if not keys:
+                break
+
+            referenced = await find_referenced_keys(keys)
+            orphans = [key for key in keys if key not in referenced]
+            failed = set(await delete_files_from_s3(orphans))
+            reaped_keys = [key for key in orphans if key not in failed]
+            if reaped_keys:
+                # Forget content hashes of finalized but never attached uploads
+                await get_database().images.delete_many({"key": {"$in": reaped_keys}})
+
+            done = [key for key in keys if key not in failed]
+            if done:
+                await redis.zrem(PENDING_UPLOADS_KEY, *done)
+            if failed:
+                # Push failures out by another grace period instead of spinning on them
+                await redis.zadd(PENDING_UPLOADS_KEY, {key: time.time() for key in failed})
+
+            reaped += len(reaped_keys)
+            if len(keys) < S3_DELETE_BATCH_SIZE:
+                break
+    finally:
+        await redis.delete(REAPER_LOCK_KEY)
+
+    return reaped
+
+async def run_upload_reaper():
+    """Background loop started from the app lifespan"""
+    while True:
+        await asyncio.sleep(settings.UPLOAD_REAPER_INTERVAL_SECONDS)
+        try:
+            reaped = await reap_orphaned_uploads()
+            if reaped:
+                print(f"🧹 Reaped {reaped} orphaned uploads")
+        except Exception as e:
+            print(f"❌ Error reaping orphaned uploads: {e}")
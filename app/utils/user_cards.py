@@ -0,0 +1,71 @@
+from typing import Dict, List
+import orjson
+from bson import ObjectId
+from app.core.config import settings
+from app.core.database import get_database
+from app.core.redis_client import get_redis
+from app.core.serialization import dumps
+from app.core.etag import VersionKeys
+from app.utils.image_variants import select_variant_url
+
+# What avatars, mentions and chat lists need to render a user
+CARD_PROJECTION = {"firstName": 1, "lastName": 1, "picturePath": 1, "pictureVariants": 1, "Year": 1}
+
+def user_card_key(user_id: str) -> str:
+    return f"card:{user_id}"
+
+def build_user_card(user: dict) -> dict:
+    return {
+        "_id": str(user["_id"]),
+        "firstName": user.get("firstName", ""),
+        "lastName": user.get("lastName", ""),
+        # Cards are rendered as avatars, always point at the thumbnail
+        "picturePath": select_variant_url(
+            user.get("picturePath", ""), user.get("pictureVariants"), settings.IMAGE_THUMBNAIL_SIZE
+        ),
+        "Year": user.get("Year", ""),
+    }
+
+async def get_user_cards(user_ids: List[str]) -> List[dict]:
+    """Cards for the given users in request order, unknown IDs are left out"""
+    user_ids = [user_id for user_id in dict.fromkeys(user_ids) if ObjectId.is_valid(user_id)]
+    if not user_ids:
+        return []
+
+    # Cards are stored with the user's version, any bump_versions on the user invalidates them
+    cards: Dict[str, dict] = {}
+    versions: Dict[str, str] = {}
+    redis = get_redis()
+    try:
+        keys = []
+        for user_id in user_ids:
+            keys += [VersionKeys.user(user_id), user_card_key(user_id)]
+        values = await redis.mget(keys)
+        for i, user_id in enumerate(user_ids):
+            version, cached = values[2 * i] or "", values[2 * i + 1]
+            versions[user_id] = version
+            if cached:
+                cached = orjson.loads(cached)
+                if cached["version"] == version:
+                    cards[user_id] = cached["card"]
+    except Exception as e:
+        print(f"❌ Error reading user cards: {e}")
+
+    missing = [ObjectId(user_id) for user_id in user_ids if user_id not in cards]
+    if missing:
+        # Primary reads, a lagging secondary would cache old cards under the new version
+        db = get_database()
+        loaded = {}
+        async for user in db.users.find({"_id": {"$in": missing}}, CARD_PROJECTION):
+            loaded[str(user["_id"])] = build_user_card(user)
+        cards.update(loaded)
+        try:
+            pipe = redis.pipeline()
+            for user_id, card in loaded.items():
+                entry = {"version": versions.get(user_id, ""), "card": card}
+                pipe.set(user_card_key(user_id), dumps(entry), ex=settings.USER_CARD_CACHE_TTL_SECONDS)
+            await pipe.execute()
+        except Exception as e:
+            print(f"❌ Error caching user cards: {e}")
+
+    return [cards[user_id] for user_id in user_ids if user_id in cards]
@@ -1,5 +1,7 @@
 from pydantic_settings import BaseSettings
-from typing import Optional
+from typing import Dict, Literal, Optional
+
+ReadPreferenceMode = Literal["primary", "primaryPreferred", "secondary", "secondaryPreferred", "nearest"]
 
 class Settings(BaseSettings):
     # Application
@@ -8,12 +10,41 @@ class Settings(BaseSettings):
     
     # MongoDB
     MONGO_URL: str
+    MONGO_MAX_POOL_SIZE: int = 100
+    MONGO_MIN_POOL_SIZE: int = 0
+    MONGO_MAX_IDLE_TIME_MS: Optional[int] = None
+    MONGO_WAIT_QUEUE_TIMEOUT_MS: Optional[int] = None
+    MONGO_COMPRESSORS: Optional[str] = None  # e.g. "zstd,snappy", needs zstandard/python-snappy
+    # Read preference for heavy read paths (message_history, search)
+    MONGO_READ_PREFERENCE: ReadPreferenceMode = "primary"
+    MONGO_READ_PREFERENCES: Dict[str, ReadPreferenceMode] = {}  # per-operation overrides
+
+    # Response compression
+    COMPRESSION_MIN_SIZE: int = 1000  # bytes
+    
+    # User search cache
+    USER_SEARCH_CACHE_TTL_SECONDS: int = 60
+    USER_SEARCH_CACHE_STALE_SECONDS: int = 30
     
     # Redis
     REDIS_HOST: str = "localhost"
     REDIS_PORT: int = 6379
     REDIS_PASSWORD: Optional[str] = None
     
+    # Notification events
+    # "streams" batches XADDs so the notification service can replay after downtime,
+    # "both" also publishes while consumers move over, "pubsub" is fire-and-forget
+    NOTIFICATION_TRANSPORT: Literal["pubsub", "streams", "both"] = "pubsub"
+    NOTIFICATION_STREAM_MAXLEN: int = 100000  # approximate, per channel stream
+    NOTIFICATION_BATCH_SIZE: int = 50  # events per pipelined flush
+    NOTIFICATION_BATCH_INTERVAL_MS: int = 20  # longest an event waits for its batch
+    
+    # Outbox relay for notification events
+    OUTBOX_TRANSACTIONS: bool = False  # needs a replica set
+    OUTBOX_BATCH_SIZE: int = 100
+    OUTBOX_POLL_INTERVAL_SECONDS: float = 1.0
+    OUTBOX_LEASE_SECONDS: int = 30  # a claimed batch is retried after this
+    
     # JWT
     JWT_SECRET: str
     JWT_ALGORITHM: str = "HS256"
@@ -0,0 +1,9 @@
+from unilink_shared import cache
+from unilink_shared.cache import cache_snapshot
+from core.redis_client import get_redis
+
+class Cache(cache.Cache):
+    """unilink_shared Cache on this service's Redis client"""
+
+    def __init__(self, namespace: str, ttl: int, **options):
+        super().__init__(get_redis, namespace, ttl, **options)
@@ -1,13 +1,21 @@
+import asyncio
 from motor.motor_asyncio import AsyncIOMotorClient
 from config.settings import settings
+from core.indexes import ensure_indexes
+from unilink_shared.database import ReadDatabases, client_options
 
 client: AsyncIOMotorClient = None
 db = None
+index_task: asyncio.Task = None
+_read_databases = ReadDatabases(settings)
 
 async def connect_to_mongo():
-    global client, db
-    client = AsyncIOMotorClient(settings.MONGO_URL)
+    global client, db, index_task
+    client = AsyncIOMotorClient(settings.MONGO_URL, **client_options(settings))
     db = client.get_default_database()
+    _read_databases.clear()
+    # Reconcile indexes without holding up startup
+    index_task = asyncio.create_task(ensure_indexes(db))
     print("Connected to MongoDB")
 
 async def close_mongo_connection():
@@ -17,4 +25,9 @@ async def close_mongo_connection():
         print("Disconnected from MongoDB")
 
 def get_database():
-    return db
\ No newline at end of file
+    return db
+
+def get_read_database(operation: str):
+    """Database for heavy read paths that tolerate replication lag"""
+    # Read-your-writes paths keep using get_database(), which reads from the primary
+    return _read_databases.get(db, operation)
@@ -0,0 +1,57 @@
+import asyncio
+import sys
+from typing import List
+from bson import ObjectId
+from pymongo import ASCENDING, DESCENDING, IndexModel
+from unilink_shared import indexes as shared_indexes
+
+# Collection -> indexes it must have
+INDEXES = {
+    "messages": [
+        IndexModel([("conversationId", ASCENDING), ("createdAt", DESCENDING)], name="conversationId_createdAt", background=True),
+        # The main API's data export reads a user's sent messages
+        IndexModel([("sender", ASCENDING), ("createdAt", ASCENDING)], name="sender_createdAt", background=True),
+    ],
+    "conversations": [
+        # Inbox pages, _id breaks ties between equal lastMessageAt values
+        IndexModel([("participants", ASCENDING), ("lastMessageAt", DESCENDING), ("_id", DESCENDING)], name="participants_lastMessageAt_id", background=True),
+    ],
+    "outbox": [
+        # Relay scans pending events oldest first, published ones expire after a week
+        IndexModel([("publishedAt", ASCENDING), ("createdAt", ASCENDING)], name="publishedAt_createdAt", background=True),
+        IndexModel([("publishedAt", ASCENDING)], name="publishedAt_ttl", expireAfterSeconds=60 * 60 * 24 * 7, background=True),
+    ],
+}
+
+# Query shapes issued by the chat service: (collection, filter, sort)
+QUERY_SHAPES = [
+    ("messages", {"conversationId": ObjectId("000000000000000000000000")}, [("createdAt", DESCENDING)]),
+    ("messages", {"sender": ObjectId("000000000000000000000000")}, [("createdAt", ASCENDING)]),
+    ("conversations", {"participants": ObjectId("000000000000000000000000")}, [("lastMessageAt", DESCENDING), ("_id", DESCENDING)]),
+    ("conversations", {"participants": {"$all": [ObjectId("000000000000000000000000"), ObjectId("000000000000000000000001")]}}, None),
+    ("outbox", {"publishedAt": None}, [("createdAt", ASCENDING)]),
+]
+
+async def ensure_indexes(db) -> List[str]:
+    """Create missing indexes, returns a description of any drift found"""
+    return await shared_indexes.ensure_indexes(db, INDEXES)
+
+async def check_query_plans(db) -> List[str]:
+    """Explain every known query shape, raises if any uses a COLLSCAN"""
+    return await shared_indexes.check_query_plans(db, QUERY_SHAPES)
+
+async def _main(check: bool):
+    from core import database
+
+    await database.connect_to_mongo()
+    try:
+        await database.index_task
+        if check:
+            await check_query_plans(database.get_database())
+            print("All query shapes use an index")
+    finally:
+        await database.close_mongo_connection()
+
+# python -m core.indexes [--check]
+if __name__ == "__main__":
+    asyncio.run(_main(check="--check" in sys.argv))
@@ -0,0 +1,17 @@
+from unilink_shared.outbox import Outbox, outbox_event
+from config.settings import settings
+from core.database import get_database
+from core.redis_client import notification_producer
+
+outbox = Outbox(
+    get_database,
+    notification_producer,
+    transactions=settings.OUTBOX_TRANSACTIONS,
+    batch_size=settings.OUTBOX_BATCH_SIZE,
+    poll_interval_seconds=settings.OUTBOX_POLL_INTERVAL_SECONDS,
+    lease_seconds=settings.OUTBOX_LEASE_SECONDS,
+)
+outbox_transaction = outbox.transaction
+enqueue_events = outbox.enqueue
+relay_outbox_batch = outbox.relay_batch
+run_outbox_relay = outbox.run_relay
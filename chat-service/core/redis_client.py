@@ -1,5 +1,6 @@
 import redis.asyncio as redis
 from config.settings import settings
+from unilink_shared.event_stream import NotificationProducer
 
 redis_client: redis.Redis = None
 redis_pub: redis.Redis = None
@@ -50,4 +51,12 @@ def get_redis_pub():
     return redis_pub
 
 def get_redis_sub():
-    return redis_sub
\ No newline at end of file
+    return redis_sub
+
+notification_producer = NotificationProducer(
+    get_redis_pub,
+    transport=settings.NOTIFICATION_TRANSPORT,
+    max_len=settings.NOTIFICATION_STREAM_MAXLEN,
+    batch_size=settings.NOTIFICATION_BATCH_SIZE,
+    flush_interval_ms=settings.NOTIFICATION_BATCH_INTERVAL_MS,
+)
@@ -1,11 +1,17 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from contextlib import asynccontextmanager
+import asyncio
 import socketio
 
 from config.settings import settings
 from core.database import connect_to_mongo, close_mongo_connection
-from core.redis_client import connect_to_redis, close_redis_connection
+from core.redis_client import connect_to_redis, close_redis_connection, notification_producer
+from unilink_shared.metrics import mongo_pool_metrics
+from unilink_shared.singleflight import singleflight
+from core.outbox import run_outbox_relay
+from core.cache import cache_snapshot
 from routes import chat
 from websocket.manager import sio
 from services.socket_service import initialize_socket_handlers
@@ -16,11 +22,14 @@ async def lifespan(app: FastAPI):
     await connect_to_mongo()
     await connect_to_redis()
     initialize_socket_handlers(sio)
+    outbox_relay = asyncio.create_task(run_outbox_relay())
     print("Chat Service - MongoDB connected")
     print("Chat Service running on port 4000")
     print("WebSocket ready for connections")
     yield
     # Shutdown
+    outbox_relay.cancel()
+    await notification_producer.close()
     await close_mongo_connection()
     await close_redis_connection()
 
@@ -33,8 +42,12 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
+# Message history and conversation lists compress well
+app.add_middleware(GZipMiddleware, minimum_size=settings.COMPRESSION_MIN_SIZE)
+
 # Mount Socket.IO
 socket_app = socketio.ASGIApp(
     sio,
@@ -47,6 +60,15 @@ socket_app = socketio.ASGIApp(
 async def health_check():
     return {"status": "OK", "service": "chat-service"}
 
+@app.get("/metrics")
+async def metrics():
+    return {
+        "mongoPool": mongo_pool_metrics.snapshot(),
+        "singleflight": singleflight.snapshot(),
+        "cache": cache_snapshot(),
+        "notifications": notification_producer.snapshot(),
+    }
+
 # Include routers
 app.include_router(chat.router, prefix="/api/chat", tags=["chat"])
 
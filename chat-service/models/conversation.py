@@ -1,6 +1,5 @@
 from datetime import datetime
 from typing import List, Optional, Dict
-from bson import ObjectId
 from pydantic import BaseModel, Field
 from models.user import PyObjectId
 
@@ -15,8 +14,6 @@ class ConversationModel(BaseModel):
 
     class Config:
         populate_by_name = True
-        arbitrary_types_allowed = True
-        json_encoders = {ObjectId: str}
         json_schema_extra = {
             "example": {
                 "participants": ["507f1f77bcf86cd799439011", "507f1f77bcf86cd799439012"],
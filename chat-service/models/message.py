@@ -1,6 +1,5 @@
 from datetime import datetime
 from typing import Optional
-from bson import ObjectId
 from pydantic import BaseModel, Field
 from models.user import PyObjectId
 
@@ -16,8 +15,6 @@ class MessageModel(BaseModel):
 
     class Config:
         populate_by_name = True
-        arbitrary_types_allowed = True
-        json_encoders = {ObjectId: str}
         json_schema_extra = {
             "example": {
                 "conversationId": "507f1f77bcf86cd799439011",
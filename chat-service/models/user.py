@@ -1,23 +1,7 @@
 from datetime import datetime
 from typing import List, Optional
-from bson import ObjectId
 from pydantic import BaseModel, Field
-
-class PyObjectId(ObjectId):
-    @classmethod
-    def __get_validators__(cls):
-        yield cls.validate
-
-    @classmethod
-    def validate(cls, v):
-        if not ObjectId.is_valid(v):
-            raise ValueError("Invalid ObjectId")
-        return ObjectId(v)
-
-    @classmethod
-    def __get_pydantic_json_schema__(cls, schema):
-        schema.update(type="string")
-        return schema
+from unilink_shared.models import PyObjectId
 
 class UserModel(BaseModel):
     id: Optional[PyObjectId] = Field(default=None, alias="_id")
@@ -31,8 +15,6 @@ class UserModel(BaseModel):
 
     class Config:
         populate_by_name = True
-        arbitrary_types_allowed = True
-        json_encoders = {ObjectId: str}
         json_schema_extra = {
             "example": {
                 "firstName": "John",
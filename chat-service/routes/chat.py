@@ -1,66 +1,110 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
 from bson import ObjectId
 from datetime import datetime
-from typing import List
+from typing import List, Optional
 
 from middleware.auth import verify_token
-from core.database import get_database
+from core.database import get_database, get_read_database
+from unilink_shared.serialization import BSONJSONResponse
+from unilink_shared.singleflight import singleflight
+from core.cache import Cache
+from config.settings import settings
 from schemas.message import SendMessageRequest, MessageResponse
 from schemas.user import UserSearchResponse, OnlineStatusRequest, OnlineStatusResponse
 from services.redis_service import RedisService
 
 router = APIRouter()
 
+# Regex searches scan users, identical queries within a minute share one result
+user_search_cache = Cache(
+    "user_search",
+    ttl=settings.USER_SEARCH_CACHE_TTL_SECONDS,
+    stale_ttl=settings.USER_SEARCH_CACHE_STALE_SECONDS,
+)
+
+def _encode_conversation_cursor(conversation: dict) -> str:
+    return f"{conversation['lastMessageAt'].isoformat()}|{conversation['_id']}"
+
+def _conversation_cursor_filter(cursor: str) -> dict:
+    """Conversations strictly after the cursor in (lastMessageAt desc, _id desc) order"""
+    last_message_at, _, conversation_id = cursor.partition("|")
+    try:
+        conversation_id = ObjectId(conversation_id)
+        last_message_at = datetime.fromisoformat(last_message_at)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return {"$or": [
+        {"lastMessageAt": {"$lt": last_message_at}},
+        {"lastMessageAt": last_message_at, "_id": {"$lt": conversation_id}},
+    ]}
+
 @router.get("/conversations")
-async def get_conversations(user: dict = Depends(verify_token)):
-    """Get all conversations for the authenticated user"""
+async def get_conversations(
+    limit: int = Query(50, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor of the previous page"),
+    user: dict = Depends(verify_token)
+):
+    """Get the authenticated user's conversations, most recent first"""
+    user_id = user["id"]
+    match = {"participants": ObjectId(user_id)}
+    if cursor:
+        match.update(_conversation_cursor_filter(cursor))
+    
     try:
-        user_id = user["id"]
         db = get_database()
         
-        # Find conversations
-        cursor = db.conversations.find({
-            "participants": ObjectId(user_id)
-        }).sort("lastMessageAt", -1)
-        
-        conversations = await cursor.to_list(length=None)
+        # Participants and last messages are joined server side, one round trip per page
+        conversations = await db.conversations.aggregate([
+            {"$match": match},
+            {"$sort": {"lastMessageAt": -1, "_id": -1}},
+            {"$limit": limit},
+            # Concise correlated lookups (MongoDB 5.0+): the join stays an indexed _id
+            # equality and the sub-pipeline projects, so whole documents never enter it
+            {"$lookup": {
+                "from": "users",
+                "localField": "participants",
+                "foreignField": "_id",
+                "pipeline": [
+                    {"$match": {"_id": {"$ne": ObjectId(user_id)}}},
+                    {"$project": {"firstName": 1, "lastName": 1, "picturePath": 1}},
+                ],
+                "as": "participantDocs",
+            }},
+            {"$lookup": {
+                "from": "messages",
+                "localField": "lastMessage",
+                "foreignField": "_id",
+                "pipeline": [
+                    {"$project": {"content": 1, "createdAt": 1}},
+                ],
+                "as": "lastMessageDocs",
+            }},
+            {"$project": {"lastMessageAt": 1, "participantDocs": 1, "lastMessageDocs": 1}},
+        ]).to_list(length=limit)
+        
+        rows = []
+        for conv in conversations:
+            # The lookup already left the requesting user out
+            if conv["participantDocs"]:
+                rows.append((conv, conv["participantDocs"][0]))
+        
+        # Presence and unread counts for the whole page in one pipeline
+        online, unread = await RedisService.get_inbox_state(
+            user_id,
+            [str(participant["_id"]) for _, participant in rows],
+            [str(conv["_id"]) for conv, _ in rows]
+        )
         
         formatted_conversations = []
-        for conv in conversations:
-            # Get other participant
-            other_participant_id = next(
-                (str(p) for p in conv["participants"] if str(p) != user_id),
-                None
-            )
-            
-            if not other_participant_id:
-                continue
-            
-            # Get participant details
-            participant = await db.users.find_one(
-                {"_id": ObjectId(other_participant_id)},
-                {"firstName": 1, "lastName": 1, "picturePath": 1}
-            )
-            
-            if not participant:
-                continue
-            
-            # Get online status
-            is_online = await RedisService.is_user_online(other_participant_id)
-            
-            # Get last message
+        for (conv, participant), is_online, unread_count in zip(rows, online, unread):
             last_message = None
-            if conv.get("lastMessage"):
-                last_msg = await db.messages.find_one({"_id": conv["lastMessage"]})
-                if last_msg:
-                    last_message = {
-                        "_id": str(last_msg["_id"]),
-                        "content": last_msg["content"],
-                        "createdAt": last_msg["createdAt"].isoformat()
-                    }
-            
-            # Get unread count
-            unread_count = await RedisService.get_unread_count(user_id, str(conv["_id"]))
+            if conv["lastMessageDocs"]:
+                last_msg = conv["lastMessageDocs"][0]
+                last_message = {
+                    "_id": str(last_msg["_id"]),
+                    "content": last_msg["content"],
+                    "createdAt": last_msg["createdAt"].isoformat()
+                }
             
             formatted_conversations.append({
                 "_id": str(conv["_id"]),
@@ -76,7 +120,10 @@ async def get_conversations(user: dict = Depends(verify_token)):
                 "unreadCount": unread_count
             })
         
-        return formatted_conversations
+        headers = {}
+        if len(conversations) == limit:
+            headers["X-Next-Cursor"] = _encode_conversation_cursor(conversations[-1])
+        return BSONJSONResponse(formatted_conversations, headers=headers)
         
     except Exception as e:
         print(f"Error fetching conversations: {e}")
@@ -108,58 +155,65 @@ async def get_messages(
             cached_messages = await RedisService.get_cached_messages(conversation_id)
             if cached_messages:
                 print("📦 Serving messages from Redis cache")
-                return {
+                return BSONJSONResponse({
                     "messages": cached_messages,
                     "totalPages": 1,
                     "currentPage": 1,
                     "fromCache": True
-                }
-        
-        # Fetch from MongoDB
-        print("📊 Serving messages from MongoDB")
-        cursor = db.messages.find({
-            "conversationId": ObjectId(conversation_id)
-        }).sort("createdAt", -1).skip((page - 1) * limit).limit(limit)
-        
-        messages = await cursor.to_list(length=limit)
-        
-        # Get sender details for each message
-        formatted_messages = []
-        for msg in messages:
-            sender = await db.users.find_one(
-                {"_id": msg["sender"]},
-                {"firstName": 1, "lastName": 1, "picturePath": 1}
-            )
-            
-            if sender:
-                formatted_messages.append({
-                    "_id": str(msg["_id"]),
-                    "conversationId": str(msg["conversationId"]),
-                    "sender": {
-                        "_id": str(sender["_id"]),
-                        "firstName": sender["firstName"],
-                        "lastName": sender["lastName"],
-                        "picturePath": sender.get("picturePath", "")
-                    },
-                    "content": msg["content"],
-                    "read": msg.get("read", False),
-                    "readAt": msg.get("readAt").isoformat() if msg.get("readAt") else None,
-                    "createdAt": msg["createdAt"].isoformat()
                 })
         
-        # Cache first page
-        if page == 1 and formatted_messages:
-            for msg in reversed(formatted_messages[:50]):
-                await RedisService.cache_message(conversation_id, msg)
+        # Fetch from MongoDB, concurrent readers of the same page share one load
+        async def load_history():
+            print("📊 Serving messages from MongoDB")
+            read_db = get_read_database("message_history")
+            cursor = read_db.messages.find({
+                "conversationId": ObjectId(conversation_id)
+            }).sort("createdAt", -1).skip((page - 1) * limit).limit(limit)
+            
+            messages = await cursor.to_list(length=limit)
+            
+            # Get sender details for each message
+            formatted_messages = []
+            for msg in messages:
+                sender = await read_db.users.find_one(
+                    {"_id": msg["sender"]},
+                    {"firstName": 1, "lastName": 1, "picturePath": 1}
+                )
+                
+                if sender:
+                    formatted_messages.append({
+                        "_id": str(msg["_id"]),
+                        "conversationId": str(msg["conversationId"]),
+                        "sender": {
+                            "_id": str(sender["_id"]),
+                            "firstName": sender["firstName"],
+                            "lastName": sender["lastName"],
+                            "picturePath": sender.get("picturePath", "")
+                        },
+                        "content": msg["content"],
+                        "read": msg.get("read", False),
+                        "readAt": msg.get("readAt").isoformat() if msg.get("readAt") else None,
+                        "createdAt": msg["createdAt"].isoformat()
+                    })
+            
+            # Cache first page
+            if page == 1 and formatted_messages:
+                for msg in reversed(formatted_messages[:50]):
+                    await RedisService.cache_message(conversation_id, msg)
+            
+            total = await read_db.messages.count_documents({"conversationId": ObjectId(conversation_id)})
+            return formatted_messages, total
         
-        total = await db.messages.count_documents({"conversationId": ObjectId(conversation_id)})
+        formatted_messages, total = await singleflight.do(
+            "message_history", f"{conversation_id}:{page}:{limit}", load_history
+        )
         
-        return {
+        return BSONJSONResponse({
             "messages": list(reversed(formatted_messages)),
             "totalPages": (total + limit - 1) // limit,
             "currentPage": page,
             "fromCache": False
-        }
+        })
         
     except HTTPException:
         raise
@@ -308,18 +362,21 @@ async def search_users(
     """Search for users"""
     try:
         user_id = user["id"]
-        db = get_database()
-        
-        # Search users
-        cursor = db.users.find({
-            "_id": {"$ne": ObjectId(user_id)},
-            "$or": [
-                {"firstName": {"$regex": query, "$options": "i"}},
-                {"lastName": {"$regex": query, "$options": "i"}}
-            ]
-        }).limit(10)
         
-        users = await cursor.to_list(length=10)
+        async def find_users():
+            db = get_read_database("search")
+            # One extra match so the searcher can be dropped and still leave 10
+            cursor = db.users.find({
+                "$or": [
+                    {"firstName": {"$regex": query, "$options": "i"}},
+                    {"lastName": {"$regex": query, "$options": "i"}}
+                ]
+            }, {"firstName": 1, "lastName": 1, "picturePath": 1}).limit(11)
+            return await cursor.to_list(length=11)
+        
+        # Cached per query rather than per searcher, online status below stays live
+        users = await user_search_cache.get_or_compute(query.lower(), find_users)
+        users = [u for u in users if str(u["_id"]) != user_id][:10]
         
         # Add online status
         users_with_status = []
@@ -333,7 +390,7 @@ async def search_users(
                 "isOnline": is_online
             })
         
-        return users_with_status
+        return BSONJSONResponse(users_with_status)
         
     except Exception as e:
         print(f"Error searching users: {e}")
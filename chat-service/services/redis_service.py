@@ -1,5 +1,5 @@
 import json
-from typing import List, Optional
+from typing import List, Optional, Tuple
 from core.redis_client import get_redis, get_redis_pub
 
 # Redis key patterns
@@ -166,6 +166,18 @@ class RedisService:
         count = await redis.get(REDIS_KEYS.unread_count(user_id, conversation_id))
         return int(count) if count else 0
     
+    @staticmethod
+    async def get_inbox_state(user_id: str, participant_ids: List[str], conversation_ids: List[str]) -> Tuple[List[bool], List[int]]:
+        """Presence of each participant and unread count of each conversation in one round trip"""
+        if not participant_ids:
+            return [], []
+        redis = get_redis()
+        pipe = redis.pipeline()
+        pipe.smismember(REDIS_KEYS.online_users(), participant_ids)
+        pipe.mget([REDIS_KEYS.unread_count(user_id, conversation_id) for conversation_id in conversation_ids])
+        online, unread = await pipe.execute()
+        return [bool(flag) for flag in online], [int(count) if count else 0 for count in unread]
+    
     @staticmethod
     async def get_total_unread(user_id: str) -> int:
         redis = get_redis()
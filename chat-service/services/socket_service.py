@@ -4,24 +4,21 @@ from datetime import datetime
 from bson import ObjectId
 from core.database import get_database
 from core.redis_client import get_redis_sub
+from core.outbox import outbox_event, outbox_transaction, enqueue_events
 from services.redis_service import RedisService, REDIS_CHANNELS, NOTIFICATION_CHANNELS
 
-async def publish_message_notification(recipient_id, sender_id, sender_name, sender_picture, content, conversation_id):
-    """Publish message notification to notification service"""
-    try:
-        await RedisService.publish(NOTIFICATION_CHANNELS.MESSAGE, {
-            "userId": recipient_id,
-            "actorId": sender_id,
-            "actorName": sender_name,
-            "actorPicture": sender_picture,
-            "relatedId": conversation_id,
-            "metadata": {
-                "messagePreview": content[:50]
-            }
-        })
-        print(f"Published message notification for user {recipient_id}")
-    except Exception as e:
-        print(f"Error publishing message notification: {e}")
+def message_notification_event(recipient_id, sender_id, sender_name, sender_picture, content, conversation_id, message_id):
+    """Outbox event notifying the recipient through the notification service"""
+    return outbox_event(NOTIFICATION_CHANNELS.MESSAGE, {
+        "userId": recipient_id,
+        "actorId": sender_id,
+        "actorName": sender_name,
+        "actorPicture": sender_picture,
+        "relatedId": conversation_id,
+        "metadata": {
+            "messagePreview": content[:50]
+        }
+    }, event_id=f"message:{message_id}")
 
 async def get_or_create_conversation(user_id1: str, user_id2: str):
     """Get or create conversation between two users"""
@@ -288,8 +285,12 @@ def initialize_socket_handlers(sio):
                 conversation = await get_or_create_conversation(user_id, recipient_id)
                 conversation_id = str(conversation['_id'])
                 
+                # Get sender info
+                sender = await get_user_info(user_id)
+                
                 # Create message
                 message = {
+                    "_id": ObjectId(),
                     "conversationId": conversation['_id'],
                     "sender": ObjectId(user_id),
                     "content": content,
@@ -298,26 +299,34 @@ def initialize_socket_handlers(sio):
                     "createdAt": datetime.utcnow(),
                     "updatedAt": datetime.utcnow()
                 }
-                result = await db.messages.insert_one(message)
-                message['_id'] = result.inserted_id
                 
                 # Update conversation
                 unread_count = conversation.get('unreadCount', {})
                 unread_count[recipient_id] = unread_count.get(recipient_id, 0) + 1
                 
-                await db.conversations.update_one(
-                    {"_id": conversation['_id']},
-                    {
-                        "$set": {
-                            "lastMessage": message['_id'],
-                            "lastMessageAt": datetime.utcnow(),
-                            "unreadCount": unread_count
-                        }
-                    }
-                )
-                
-                # Get sender info
-                sender = await get_user_info(user_id)
+                # The notification is recorded with the message and relayed in the background
+                async with outbox_transaction() as db_session:
+                    await db.messages.insert_one(message, session=db_session)
+                    await db.conversations.update_one(
+                        {"_id": conversation['_id']},
+                        {
+                            "$set": {
+                                "lastMessage": message['_id'],
+                                "lastMessageAt": datetime.utcnow(),
+                                "unreadCount": unread_count
+                            }
+                        },
+                        session=db_session
+                    )
+                    await enqueue_events([message_notification_event(
+                        recipient_id,
+                        user_id,
+                        f"{sender['firstName']} {sender['lastName']}",
+                        sender['picturePath'],
+                        content,
+                        conversation_id,
+                        str(message['_id'])
+                    )], session=db_session)
                 
                 # Prepare message object
                 message_obj = {
@@ -335,16 +344,6 @@ def initialize_socket_handlers(sio):
                 # Increment unread
                 await RedisService.increment_unread(recipient_id, conversation_id)
                 
-                # Publish message notification
-                await publish_message_notification(
-                    recipient_id,
-                    user_id,
-                    f"{sender['firstName']} {sender['lastName']}",
-                    sender['picturePath'],
-                    content,
-                    conversation_id
-                )
-                
                 # Publish message
                 await RedisService.publish(REDIS_CHANNELS.MESSAGE_NEW, {
                     "conversationId": conversation_id,
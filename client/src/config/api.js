@@ -24,6 +24,7 @@ export const API_ENDPOINTS = {
 
   // S3 endpoints
   S3_UPLOAD_URL: `${API_BASE_URL}/s3/upload-url`,
+  S3_FINALIZE: `${API_BASE_URL}/s3/finalize`,
 
   // Assets
   ASSET: (filename) => {
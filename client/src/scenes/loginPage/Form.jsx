@@ -9,6 +9,7 @@ import Dropzone from "react-dropzone";
 import FlexBetween from "components/FlexBetween";
 import OTPVerification from "components/OTPVerification";
 import { API_ENDPOINTS } from "config/api";
+import { finalizeUpload } from "utils/s3Upload";
 
 const registerSchema = yup.object().shape({
   firstName: yup.string().required("required"),
@@ -88,7 +89,7 @@ const Form = () => {
         });
   
         if (response.ok) {
-          const { uploadUrl, accessUrl } = await response.json();
+          const { uploadUrl, key, accessUrl } = await response.json();
           console.log("Got presigned URL, uploading file...");
   
           const uploadResponse = await fetch(uploadUrl, {
@@ -100,8 +101,8 @@ const Form = () => {
           });
   
           if (uploadResponse.ok) {
-            picturePath = accessUrl;
-            console.log("Image uploaded to S3:", accessUrl);
+            picturePath = await finalizeUpload(key, accessUrl);
+            console.log("Image uploaded to S3:", picturePath);
           } else {
             throw new Error("Failed to upload image to S3");
           }
@@ -1,5 +1,35 @@
 import { API_ENDPOINTS } from "config/api";
 
+/**
+ * Deduplicate an uploaded file by content, right after the PUT
+ * @param {string} key - The object key returned with the presigned URL
+ * @param {string} accessUrl - The access URL returned with the presigned URL
+ * @returns {Promise<string>} - The canonical access URL (the given one if finalizing fails)
+ */
+export const finalizeUpload = async (key, accessUrl) => {
+  try {
+    const response = await fetch(API_ENDPOINTS.S3_FINALIZE, {
+      method: "POST",
+      headers: {
+        "Content-Type": "application/json",
+      },
+      body: JSON.stringify({ key }),
+    });
+
+    if (!response.ok) {
+      console.error("❌ Finalize failed:", response.status);
+      return accessUrl;
+    }
+
+    const { accessUrl: canonicalUrl } = await response.json();
+    return canonicalUrl;
+  } catch (error) {
+    // The upload itself succeeded, keep using it as is
+    console.error("❌ Error finalizing upload:", error);
+    return accessUrl;
+  }
+};
+
 /**
  * Upload file to S3 using presigned URL
  * @param {File} file - The file to upload
@@ -36,7 +66,7 @@ export const uploadToS3 = async (file, type, token) => {
       throw new Error(errorData.message || `Failed to get upload URL (${response.status})`);
     }
 
-    const { uploadUrl, accessUrl } = await response.json();
+    const { uploadUrl, key, accessUrl } = await response.json();
     console.log("✅ Got presigned URL");
 
     // Step 2: Upload file directly to S3
@@ -54,9 +84,12 @@ export const uploadToS3 = async (file, type, token) => {
     }
 
     console.log("✅ File uploaded successfully to S3");
-    console.log("🔗 Access URL:", accessUrl);
 
-    return accessUrl;
+    // Step 3: Let the backend deduplicate it while the user finishes the form
+    const finalUrl = await finalizeUpload(key, accessUrl);
+    console.log("🔗 Access URL:", finalUrl);
+
+    return finalUrl;
   } catch (error) {
     console.error("❌ Error uploading to S3:", error);
     throw error;
@@ -0,0 +1,5 @@
+"""Infrastructure shared by the UniLink API and the chat service.
+
+Modules that need a Redis client, database or settings take them as
+arguments, each service wires them up in its own core package.
+"""
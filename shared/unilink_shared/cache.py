@@ -0,0 +1,153 @@
+import asyncio
+import math
+import random
+import time
+from collections import Counter
+from typing import Any, Awaitable, Callable, Optional
+import orjson
+import redis.asyncio as aioredis
+from unilink_shared.serialization import dumps
+from unilink_shared.singleflight import singleflight
+
+# Per namespace: hit, miss, stale, early_refresh, negative_hit, error
+cache_stats = {}
+
+# Read the namespace generation and the entry under it in one round trip
+_READ = """
+local generation = redis.call('get', KEYS[1]) or '0'
+return {generation, redis.call('get', ARGV[1] .. generation .. ':' .. ARGV[2])}
+"""
+
+class Cache:
+    """Redis get-or-compute cache that avoids thundering herds.
+
+    - TTLs are jittered so entries written together do not expire together
+    - entries are refreshed early with a probability that rises towards
+      expiry (XFetch), weighted by how long they took to compute
+    - None results are cached for negative_ttl so misses are not retried
+      against Mongo on every request
+    - expired entries are served for up to stale_ttl more seconds while a
+      single background refresh (guarded by a Redis lock) replaces them
+    - entries remember the version they were computed for, a different
+      version is a miss, and invalidate_all() bumps the namespace
+      generation, orphaning every key
+    - concurrent misses in one process share a single compute
+
+    Values go through JSON, so ObjectIds and datetimes come back as strings.
+    """
+
+    def __init__(
+        self,
+        get_client: Callable[[], aioredis.Redis],
+        namespace: str,
+        ttl: int,
+        stale_ttl: int = 0,
+        negative_ttl: int = 30,
+        jitter: float = 0.1,
+        beta: float = 1.0,
+    ):
+        self.get_client = get_client
+        self.namespace = namespace
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.negative_ttl = negative_ttl
+        self.jitter = jitter
+        self.beta = beta
+        self.stats = cache_stats.setdefault(namespace, Counter())
+        self._refreshing = set()
+
+    @property
+    def _generation_key(self) -> str:
+        return f"cache:{self.namespace}:generation"
+
+    def _entry_key(self, generation: str, key: str) -> str:
+        return f"cache:{self.namespace}:{generation}:{key}"
+
+    async def _read(self, key: str):
+        script = self.get_client().register_script(_READ)
+        generation, raw = await script(
+            keys=[self._generation_key], args=[f"cache:{self.namespace}:", key]
+        )
+        return generation, orjson.loads(raw) if raw else None
+
+    async def _compute_and_store(self, generation: str, key: str, compute: Callable[[], Awaitable[Any]], version: Optional[str]) -> Any:
+        started = time.monotonic()
+        value = await compute()
+        delta = time.monotonic() - started
+
+        ttl = self.negative_ttl if value is None else self.ttl
+        ttl = max(1, ttl * random.uniform(1 - self.jitter, 1 + self.jitter))
+        entry = {"value": value, "version": version, "delta": delta, "expiresAt": time.time() + ttl}
+        try:
+            await self.get_client().set(
+                self._entry_key(generation, key), dumps(entry), ex=math.ceil(ttl + self.stale_ttl)
+            )
+        except Exception as e:
+            print(f"Error writing cache {self.namespace}:{key}: {e}")
+        return value
+
+    async def _refresh(self, generation: str, key: str, compute: Callable[[], Awaitable[Any]], version: Optional[str]):
+        # One instance refreshes, the others keep serving the current entry
+        lock_key = f"cache:{self.namespace}:lock:{key}"
+        try:
+            redis = self.get_client()
+            if not await redis.set(lock_key, "1", nx=True, ex=max(1, self.stale_ttl or self.ttl)):
+                return
+            try:
+                await self._compute_and_store(generation, key, compute, version)
+            finally:
+                await redis.delete(lock_key)
+        except Exception as e:
+            print(f"Error refreshing cache {self.namespace}:{key}: {e}")
+
+    def _refresh_in_background(self, generation: str, key: str, compute: Callable[[], Awaitable[Any]], version: Optional[str]):
+        if key in self._refreshing:
+            return
+        self._refreshing.add(key)
+        task = asyncio.create_task(self._refresh(generation, key, compute, version))
+        task.add_done_callback(lambda _: self._refreshing.discard(key))
+
+    async def get_or_compute(self, key: str, compute: Callable[[], Awaitable[Any]], version: Optional[str] = None) -> Any:
+        try:
+            generation, entry = await self._read(key)
+        except Exception as e:
+            # Redis trouble never fails the request, fall through to the source
+            print(f"Error reading cache {self.namespace}:{key}: {e}")
+            self.stats["error"] += 1
+            return await compute()
+
+        if entry is not None and entry.get("version") == version:
+            remaining = entry["expiresAt"] - time.time()
+            if remaining <= 0:
+                self.stats["stale"] += 1
+                self._refresh_in_background(generation, key, compute, version)
+            elif entry["delta"] * self.beta * -math.log(1 - random.random()) >= remaining:
+                self.stats["early_refresh"] += 1
+                self._refresh_in_background(generation, key, compute, version)
+            elif entry["value"] is None:
+                self.stats["negative_hit"] += 1
+            else:
+                self.stats["hit"] += 1
+            return entry["value"]
+
+        self.stats["miss"] += 1
+        return await singleflight.do(
+            f"cache:{self.namespace}", f"{generation}:{key}:{version}",
+            lambda: self._compute_and_store(generation, key, compute, version)
+        )
+
+    async def invalidate(self, key: str):
+        try:
+            generation, _ = await self._read(key)
+            await self.get_client().delete(self._entry_key(generation, key))
+        except Exception as e:
+            print(f"Error invalidating cache {self.namespace}:{key}: {e}")
+
+    async def invalidate_all(self):
+        try:
+            await self.get_client().incr(self._generation_key)
+        except Exception as e:
+            print(f"Error invalidating cache {self.namespace}: {e}")
+
+def cache_snapshot() -> dict:
+    return {namespace: dict(stats) for namespace, stats in cache_stats.items()}
@@ -0,0 +1,46 @@
+from pymongo import ReadPreference
+from unilink_shared.metrics import mongo_pool_metrics
+
+READ_PREFERENCES = {
+    "primary": ReadPreference.PRIMARY,
+    "primaryPreferred": ReadPreference.PRIMARY_PREFERRED,
+    "secondary": ReadPreference.SECONDARY,
+    "secondaryPreferred": ReadPreference.SECONDARY_PREFERRED,
+    "nearest": ReadPreference.NEAREST,
+}
+
+def client_options(settings) -> dict:
+    """Motor client options from the MONGO_* pool and compression settings"""
+    options = {
+        "maxPoolSize": settings.MONGO_MAX_POOL_SIZE,
+        "minPoolSize": settings.MONGO_MIN_POOL_SIZE,
+        "maxIdleTimeMS": settings.MONGO_MAX_IDLE_TIME_MS,
+        "waitQueueTimeoutMS": settings.MONGO_WAIT_QUEUE_TIMEOUT_MS,
+        "event_listeners": [mongo_pool_metrics],
+    }
+    if settings.MONGO_COMPRESSORS:
+        options["compressors"] = settings.MONGO_COMPRESSORS
+    return options
+
+class ReadDatabases:
+    """Database handles per read preference, built on first use.
+
+    The mode comes from MONGO_READ_PREFERENCES for the operation, falling back
+    to MONGO_READ_PREFERENCE.
+    """
+
+    def __init__(self, settings):
+        self.settings = settings
+        self._databases = {}
+
+    def get(self, db, operation: str):
+        mode = self.settings.MONGO_READ_PREFERENCES.get(operation, self.settings.MONGO_READ_PREFERENCE)
+        if mode == "primary":
+            return db
+        if mode not in self._databases:
+            self._databases[mode] = db.with_options(read_preference=READ_PREFERENCES[mode])
+        return self._databases[mode]
+
+    def clear(self):
+        """Forget handles built on a previous client"""
+        self._databases.clear()
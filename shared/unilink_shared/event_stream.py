@@ -0,0 +1,113 @@
+import asyncio
+import json
+from collections import Counter
+from typing import Callable, List, Optional, Tuple
+import redis.asyncio as aioredis
+
+class NotificationProducer:
+    """Publishes notification events to Redis Streams in micro-batches.
+
+    Events are buffered and written with one pipelined XADD per event once
+    batch_size events are waiting or flush_interval_ms has passed, whichever
+    comes first. Each channel is also the stream key, trimmed with MAXLEN ~
+    so Redis can drop whole macro nodes cheaply. Unlike PUBLISH, events sit
+    in the stream until the consumer reads them, so a restarting
+    notification service replays what it missed.
+
+    transport "pubsub" keeps the old one PUBLISH per event, "both" writes to
+    streams and pub/sub while consumers migrate. A batch that fails to reach
+    the streams falls back to PUBLISH.
+    """
+
+    def __init__(
+        self,
+        get_client: Callable[[], aioredis.Redis],
+        transport: str = "pubsub",
+        max_len: int = 100000,
+        batch_size: int = 50,
+        flush_interval_ms: int = 20,
+    ):
+        self.get_client = get_client
+        self.transport = transport
+        self.max_len = max_len
+        self.batch_size = batch_size
+        self.flush_interval_ms = flush_interval_ms
+        self.stats = Counter()
+        self._buffer: List[Tuple[str, str]] = []
+        self._flush_task: Optional[asyncio.Task] = None
+
+    async def publish(self, channel: str, data: dict):
+        payload = json.dumps(data, default=str)
+        if self.transport == "pubsub":
+            await self._publish_all([(channel, payload)])
+            return
+
+        self._buffer.append((channel, payload))
+        if len(self._buffer) >= self.batch_size:
+            await self.flush()
+        elif self._flush_task is None:
+            self._flush_task = asyncio.create_task(self._flush_later())
+
+    async def _flush_later(self):
+        await asyncio.sleep(self.flush_interval_ms / 1000)
+        self._flush_task = None
+        await self.flush()
+
+    async def flush(self):
+        if self._flush_task is not None and self._flush_task is not asyncio.current_task():
+            self._flush_task.cancel()
+        self._flush_task = None
+        batch, self._buffer = self._buffer, []
+        if not batch:
+            return
+
+        try:
+            await self._xadd(batch)
+            self.stats["streamed"] += len(batch)
+            self.stats["batches"] += 1
+        except Exception as e:
+            print(f"Error streaming {len(batch)} notification events, falling back to pub/sub: {e}")
+            self.stats["fallback"] += len(batch)
+            await self._publish_all(batch)
+            return
+
+        if self.transport == "both":
+            await self._publish_all(batch)
+
+    async def _xadd(self, batch: List[Tuple[str, str]]):
+        pipe = self.get_client().pipeline(transaction=False)
+        for channel, payload in batch:
+            pipe.xadd(channel, {"data": payload}, maxlen=self.max_len, approximate=True)
+        await pipe.execute()
+
+    async def _publish(self, batch: List[Tuple[str, str]]):
+        pipe = self.get_client().pipeline(transaction=False)
+        for channel, payload in batch:
+            pipe.publish(channel, payload)
+        await pipe.execute()
+
+    async def _publish_all(self, batch: List[Tuple[str, str]]):
+        try:
+            await self._publish(batch)
+            self.stats["published"] += len(batch)
+        except Exception as e:
+            print(f"Error publishing {len(batch)} notification events: {e}")
+            self.stats["dropped"] += len(batch)
+
+    async def deliver(self, events: List[Tuple[str, dict]]):
+        """Write events right away, raising if they did not reach Redis"""
+        batch = [(channel, json.dumps(data, default=str)) for channel, data in events]
+        if self.transport != "pubsub":
+            await self._xadd(batch)
+            self.stats["streamed"] += len(batch)
+            self.stats["batches"] += 1
+        if self.transport != "streams":
+            await self._publish(batch)
+            self.stats["published"] += len(batch)
+
+    async def close(self):
+        """Flush whatever is still buffered, call before closing Redis"""
+        await self.flush()
+
+    def snapshot(self) -> dict:
+        return {"transport": self.transport, "buffered": len(self._buffer), **self.stats}
@@ -0,0 +1,74 @@
+from typing import List
+
+# Options that change index semantics and therefore count as drift
+_COMPARED_OPTIONS = ("unique", "sparse", "expireAfterSeconds", "partialFilterExpression")
+
+def _describe_drift(current: dict, spec: dict) -> List[str]:
+    problems = []
+    current_key = [(field, int(direction)) for field, direction in current["key"]]
+    spec_key = [(field, int(direction)) for field, direction in spec["key"].items()]
+    if current_key != spec_key:
+        problems.append(f"key {current_key} != {spec_key}")
+    for option in _COMPARED_OPTIONS:
+        if current.get(option) != spec.get(option) and (current.get(option) or spec.get(option)):
+            problems.append(f"{option} {current.get(option)!r} != {spec.get(option)!r}")
+    return problems
+
+async def ensure_indexes(db, indexes: dict) -> List[str]:
+    """Create indexes missing from the registry ({collection: [IndexModel]}), returns a description of any drift found"""
+    drift = []
+    for collection_name, models in indexes.items():
+        collection = db[collection_name]
+        existing = await collection.index_information()
+
+        missing = []
+        for model in models:
+            spec = model.document
+            current = existing.get(spec["name"])
+            if current is None:
+                missing.append(model)
+                continue
+            for problem in _describe_drift(current, spec):
+                drift.append(f"{collection_name}.{spec['name']}: {problem}")
+
+        declared = {model.document["name"] for model in models} | {"_id_"}
+        for name in existing:
+            if name not in declared:
+                drift.append(f"{collection_name}.{name}: not declared in registry")
+
+        if missing:
+            try:
+                created = await collection.create_indexes(missing)
+                print(f"Created indexes on {collection_name}: {', '.join(created)}")
+            except Exception as e:
+                print(f"Error creating indexes on {collection_name}: {e}")
+
+    for problem in drift:
+        print(f"Index drift: {problem}")
+    return drift
+
+def _plan_stages(plan: dict):
+    yield plan.get("stage")
+    if "inputStage" in plan:
+        yield from _plan_stages(plan["inputStage"])
+    for child in plan.get("inputStages", []):
+        yield from _plan_stages(child)
+
+async def check_query_plans(db, query_shapes: list) -> List[str]:
+    """Explain every (collection, filter, sort) shape, raises if any uses a COLLSCAN"""
+    collscans = []
+    for collection_name, query, sort in query_shapes:
+        cursor = db[collection_name].find(query)
+        if sort:
+            cursor = cursor.sort(sort)
+        explain = await cursor.explain()
+        winning_plan = explain["queryPlanner"]["winningPlan"]
+        # The slot based engine nests the classic plan under queryPlan
+        winning_plan = winning_plan.get("queryPlan", winning_plan)
+        if "COLLSCAN" in set(_plan_stages(winning_plan)):
+            collscans.append(f"{collection_name} {query} sort={sort}")
+
+    if collscans:
+        raise RuntimeError("Query shapes using COLLSCAN: " + "; ".join(collscans))
+    return collscans
+
@@ -0,0 +1,75 @@
+import threading
+from collections import Counter
+from pymongo import monitoring
+
+class MongoPoolMetrics(monitoring.ConnectionPoolListener):
+    """Connection pool wait-time and usage counters, fed by the driver"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.checkout_failures = Counter()
+        self.wait_time_total = 0.0
+        self.wait_time_max = 0.0
+        self.open_connections = 0
+        self.checked_out = 0
+
+    def _record_wait(self, duration):
+        if duration is None:
+            return
+        self.wait_time_total += duration
+        self.wait_time_max = max(self.wait_time_max, duration)
+
+    def connection_checked_out(self, event):
+        with self._lock:
+            self.checkouts += 1
+            self.checked_out += 1
+            self._record_wait(getattr(event, "duration", None))
+
+    def connection_check_out_failed(self, event):
+        with self._lock:
+            self.checkout_failures[str(event.reason)] += 1
+            self._record_wait(getattr(event, "duration", None))
+
+    def connection_checked_in(self, event):
+        with self._lock:
+            self.checked_out -= 1
+
+    def connection_created(self, event):
+        with self._lock:
+            self.open_connections += 1
+
+    def connection_closed(self, event):
+        with self._lock:
+            self.open_connections -= 1
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_check_out_started(self, event):
+        pass
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "checkouts": self.checkouts,
+                "checkoutFailures": dict(self.checkout_failures),
+                "waitTimeAvgMs": round(self.wait_time_total / self.checkouts * 1000, 3) if self.checkouts else 0.0,
+                "waitTimeMaxMs": round(self.wait_time_max * 1000, 3),
+                "openConnections": self.open_connections,
+                "checkedOut": self.checked_out,
+            }
+
+mongo_pool_metrics = MongoPoolMetrics()
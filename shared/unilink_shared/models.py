@@ -0,0 +1,30 @@
+from bson import ObjectId
+from pydantic_core import core_schema
+
+class PyObjectId(ObjectId):
+    """ObjectId field: accepts ObjectId or 24-char hex, serializes to str in JSON"""
+
+    @classmethod
+    def __get_pydantic_core_schema__(cls, _source_type, _handler):
+        from_str = core_schema.chain_schema([
+            core_schema.str_schema(),
+            core_schema.no_info_plain_validator_function(cls.validate),
+        ])
+        return core_schema.json_or_python_schema(
+            json_schema=from_str,
+            python_schema=core_schema.union_schema([
+                core_schema.is_instance_schema(ObjectId),
+                from_str,
+            ]),
+            serialization=core_schema.plain_serializer_function_ser_schema(str, when_used="json"),
+        )
+
+    @classmethod
+    def __get_pydantic_json_schema__(cls, _core_schema, handler):
+        return handler(core_schema.str_schema())
+
+    @classmethod
+    def validate(cls, v):
+        if not ObjectId.is_valid(v):
+            raise ValueError("Invalid ObjectId")
+        return ObjectId(v)
@@ -0,0 +1,118 @@
+import asyncio
+import uuid
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta
+from typing import Callable, List, Optional
+from bson import ObjectId
+from pymongo.errors import BulkWriteError
+from unilink_shared.event_stream import NotificationProducer
+
+def outbox_event(channel: str, data: dict, event_id: Optional[str] = None) -> dict:
+    """Outbox document for a notification event.
+
+    Pass an event_id derived from the domain change (e.g. the message ID)
+    so writing the same change twice records the event once. The relay
+    sends the ID along as eventId for the consumer to drop redeliveries.
+    """
+    return {
+        "_id": event_id or str(ObjectId()),
+        "channel": channel,
+        "data": data,
+        "createdAt": datetime.utcnow(),
+        "publishedAt": None,
+        "lockedUntil": None,
+    }
+
+class Outbox:
+    """Transactional outbox in the outbox collection, relayed to the producer.
+
+    Transactions need a replica set, with transactions off
+    transaction() yields None and the writes simply run one after the other.
+    """
+
+    def __init__(
+        self,
+        get_database: Callable,
+        producer: NotificationProducer,
+        transactions: bool = False,
+        batch_size: int = 100,
+        poll_interval_seconds: float = 1.0,
+        lease_seconds: int = 30,
+    ):
+        self.get_database = get_database
+        self.producer = producer
+        self.transactions = transactions
+        self.batch_size = batch_size
+        self.poll_interval_seconds = poll_interval_seconds
+        self.lease_seconds = lease_seconds
+        # Set when events are enqueued so the relay does not wait for its next poll
+        self._wakeup = asyncio.Event()
+
+    @asynccontextmanager
+    async def transaction(self):
+        """Session that commits domain writes and their outbox events together"""
+        if not self.transactions:
+            yield None
+            return
+        async with await self.get_database().client.start_session() as session:
+            async with session.start_transaction():
+                yield session
+
+    async def enqueue(self, events: List[dict], session=None):
+        if not events:
+            return
+        try:
+            await self.get_database().outbox.insert_many(events, ordered=False, session=session)
+        except BulkWriteError as e:
+            # Already recorded under the same event ID
+            if any(error["code"] != 11000 for error in e.details["writeErrors"]):
+                raise
+        self._wakeup.set()
+
+    async def relay_batch(self) -> int:
+        """Publish one batch of pending events, returns how many were claimed"""
+        db = self.get_database()
+        now = datetime.utcnow()
+        claimable = {"publishedAt": None, "$or": [{"lockedUntil": None}, {"lockedUntil": {"$lt": now}}]}
+        pending = await db.outbox.find(claimable, {"_id": 1}) \
+            .sort("createdAt", 1) \
+            .limit(self.batch_size) \
+            .to_list(length=self.batch_size)
+        if not pending:
+            return 0
+
+        # Lease the batch so relays on other instances skip it, an expired lease is retried
+        token = uuid.uuid4().hex
+        await db.outbox.update_many(
+            {"_id": {"$in": [doc["_id"] for doc in pending]}, **claimable},
+            {"$set": {"lockedUntil": now + timedelta(seconds=self.lease_seconds), "lockedBy": token}}
+        )
+        claimed = await db.outbox.find({"lockedBy": token, "publishedAt": None}).sort("createdAt", 1).to_list(length=None)
+        if not claimed:
+            return len(pending)
+
+        # At least once: a crash between delivering and marking publishes the batch again
+        await self.producer.deliver(
+            [(doc["channel"], {**doc["data"], "eventId": doc["_id"]}) for doc in claimed]
+        )
+        await db.outbox.update_many(
+            {"_id": {"$in": [doc["_id"] for doc in claimed]}},
+            {"$set": {"publishedAt": datetime.utcnow()}, "$unset": {"lockedUntil": "", "lockedBy": ""}}
+        )
+        return len(pending)
+
+    async def run_relay(self):
+        while True:
+            self._wakeup.clear()
+            try:
+                if await self.relay_batch() == self.batch_size:
+                    # Likely more waiting, keep draining
+                    continue
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Error relaying outbox events: {e}")
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval_seconds)
+            except asyncio.TimeoutError:
+                pass
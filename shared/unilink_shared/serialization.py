@@ -0,0 +1,20 @@
+import orjson
+from bson import ObjectId
+from starlette.responses import Response
+
+def bson_default(obj):
+    """orjson fallback for BSON types it does not know natively"""
+    if isinstance(obj, ObjectId):
+        return str(obj)
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+def dumps(content) -> bytes:
+    # datetime is serialized natively by orjson, in the same format pydantic uses
+    return orjson.dumps(content, default=bson_default, option=orjson.OPT_NON_STR_KEYS)
+
+class BSONJSONResponse(Response):
+    """JSON response rendered with orjson, accepting raw Mongo documents"""
+    media_type = "application/json"
+
+    def render(self, content) -> bytes:
+        return dumps(content)
@@ -0,0 +1,48 @@
+import asyncio
+from collections import Counter
+from typing import Any, Awaitable, Callable, Dict, Tuple
+
+class SingleFlight:
+    """Collapses concurrent identical reads into one in-flight call.
+
+    The first caller for a key starts the call, everyone arriving while it
+    runs awaits the same task. The task is shielded so a disconnecting
+    client does not cancel it for the others. All callers get the same
+    object, so treat results as read-only.
+    """
+
+    def __init__(self):
+        self._inflight: Dict[Tuple[str, str], asyncio.Task] = {}
+        self.calls = Counter()
+        self.coalesced = Counter()
+
+    def _forget(self, flight: Tuple[str, str], task: asyncio.Task):
+        if self._inflight.get(flight) is task:
+            del self._inflight[flight]
+        # Nobody may be left to await a failed call, mark the exception as seen
+        if not task.cancelled():
+            task.exception()
+
+    async def do(self, namespace: str, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        flight = (namespace, key)
+        self.calls[namespace] += 1
+        task = self._inflight.get(flight)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._inflight[flight] = task
+            task.add_done_callback(lambda done: self._forget(flight, done))
+        else:
+            self.coalesced[namespace] += 1
+        return await asyncio.shield(task)
+
+    def snapshot(self) -> dict:
+        return {
+            namespace: {
+                "calls": self.calls[namespace],
+                "coalesced": self.coalesced[namespace],
+                "inFlight": sum(1 for ns, _ in self._inflight if ns == namespace),
+            }
+            for namespace in self.calls
+        }
+
+singleflight = SingleFlight()
@@ -60,14 +60,14 @@ cd "%cd%\.."
 REM Start Main API
 echo [4/5] Starting Main API (Port 3001)...
 cd "%MAIN_DIR%"
-start "Main API" cmd /k "python -m venv .venv && .venv\Scripts\activate && pip install -q -r ..\requirements.txt && uvicorn main:app --host 0.0.0.0 --port 3001"
+start "Main API" cmd /k "python -m venv .venv && .venv\Scripts\activate && pip install -q -e ..\shared && pip install -q -r ..\requirements.txt && uvicorn main:app --host 0.0.0.0 --port 3001"
 timeout /t 3 >nul
 echo [OK] Main API started
 
 REM Start Chat Service
 echo [5/5] Starting Chat Service (Port 4000)...
 cd "%CHAT_DIR%"
-start "Chat Service" cmd /k "python -m venv .venv && .venv\Scripts\activate && pip install -q -e . && uvicorn main:app --host 0.0.0.0 --port 4000"
+start "Chat Service" cmd /k "python -m venv .venv && .venv\Scripts\activate && pip install -q -e ..\shared && pip install -q -e . && uvicorn main:app --host 0.0.0.0 --port 4000"
 timeout /t 3 >nul
 echo [OK] Chat Service started
 
@@ -206,6 +206,7 @@ start_main_api() {
     # Activate virtual environment and install dependencies
     source .venv/bin/activate
     pip install -q --upgrade pip
+    pip install -q -e ../shared 2>&1 | grep -v "already satisfied" || true
     pip install -q -r ../requirements.txt 2>&1 | grep -v "already satisfied" || true
     
     # Start the service
@@ -234,6 +235,7 @@ start_chat_service() {
     # Activate virtual environment and install dependencies
     source .venv/bin/activate
     pip install -q --upgrade pip
+    pip install -q -e ../shared 2>&1 | grep -v "already satisfied" || true
     
     # Install dependencies from pyproject.toml
     if [ -f "pyproject.toml" ]; then